@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""Page objects performance benchmark over recorded (golden) frames
+
+Runs every page class against its golden frames and measures is_visible and
+each OCR/match property in two passes over new page instances:
+
+- cold: template registry, OCR cache, learned glyph sets and location index
+  emptied before the property is read
+- warm: the same caches as filled by the cold pass, so most OCR reads are
+  OCR cache hits
+
+Reports latency percentiles per property and fails when the p50 or p90 of
+a property regresses past the stored baseline. A property that raises is
+reported as an error: errors fail the run and are never compared or stored
+as baseline.
+
+Golden frames default to the reference screenshots of each page
+(<page>/images/ref/*.png). Use --frames DIR to read DIR/<PageClass>/*.png.
+
+Usage:
+    python -m benchmarks.page_objects
+    python -m benchmarks.page_objects --update-baseline
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import stbt
+
+from common.la.atleti import page_atleti
+from common.la.covid import page_covid
+from common.pages.ajustes import page_ajustes
+from common.pages.apps import page_apps
+from common.pages.bloqueo_de_canales import page_bloqueo_de_canales
+from common.pages.en_vivo import page_en_vivo
+from common.pages.guia import page_guia
+from common.pages.home import page_home
+from common.pages.pin import page_pin
+from common.utils import digit_reader, location_index, ocr_cache, storage, templates
+
+logger = logging.getLogger(__file__)
+
+PAGES = [
+    page_home.Home,
+    page_guia.Guide,
+    page_en_vivo.EnVivo,
+    page_pin.Pin,
+    page_ajustes.Ajustes,
+    page_apps.Apps,
+    page_bloqueo_de_canales.BlockChannels,
+    page_covid.Covid,
+    page_atleti.Atleti,
+]
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+PERCENTILES = (50, 90, 99)
+
+# Percentiles checked against the baseline. p99 of a few reads is the
+# slowest one, too noisy to fail on
+COMPARED_PERCENTILES = (50, 90)
+
+# Allowed slowdown over the baseline percentiles before failing
+DEFAULT_TOLERANCE = 0.25
+
+# Absolute slack (seconds) so sub-millisecond properties do not flap
+SLACK_SECS = 0.002
+
+
+def golden_frames(page_cls, frames_dir=None):
+    """Returns list of stbt.Frame for page_cls"""
+    if frames_dir:
+        pattern = os.path.join(frames_dir, page_cls.__name__, "*.png")
+    else:
+        module_dir = os.path.dirname(sys.modules[page_cls.__module__].__file__)
+        pattern = os.path.join(module_dir, "images", "ref", "*.png")
+
+    return [
+        stbt.Frame(cv2.imread(path), time=0.0) for path in sorted(glob.glob(pattern))
+    ]
+
+
+def page_properties(page_cls):
+    """Returns public property names of page_cls, is_visible first"""
+    names = sorted(
+        name
+        for name in dir(page_cls)
+        if not name.startswith("_") and isinstance(getattr(page_cls, name), property)
+    )
+    names.remove("is_visible")
+
+    return ["is_visible"] + names
+
+
+def percentile(values, p):
+    """Nearest-rank percentile"""
+    values = sorted(values)
+    rank = max(0, int(round(p / 100.0 * len(values) + 0.5)) - 1)
+    return values[min(rank, len(values) - 1)]
+
+
+def measure(page_cls, name, frames, repeat):
+    """Returns (timings, errors) of reading page_cls.name on each frame
+
+    Returns:
+        tuple: list of seconds of the reads that succeeded and list of the
+        exceptions raised by the others
+    """
+    timings = []
+    errors = []
+
+    for _ in range(repeat):
+        for frame in frames:
+            page = page_cls(frame=frame)
+            start = time.time()
+            try:
+                getattr(page, name)
+            except Exception as e:
+                errors.append(e)
+                logger.error("{}.{}: {!r}".format(page_cls.__name__, name, e))
+            else:
+                timings.append(time.time() - start)
+
+    return timings, errors
+
+
+def clear_caches(data_dir, name):
+    """Empties the caches a cold read of property name starts without"""
+    templates.registry.clear()
+    location_index.index.clear()
+    digit_reader.reset_all()
+    ocr_cache.cache = ocr_cache.OcrCache(
+        path=os.path.join(data_dir, "ocr_cache_{}.sqlite".format(name))
+    )
+
+
+def run(frames_dir=None, repeat=5):
+    """Returns dict "Page.property.cold|warm" -> percentiles in seconds and
+    number of errors
+    """
+    results = {}
+    data_dir = tempfile.mkdtemp()
+    default_cache = ocr_cache.cache
+    default_data_dir = os.environ.get(storage.DATA_DIR_ENV)
+
+    # Keep OCR results and learned glyphs out of the user stores
+    os.environ[storage.DATA_DIR_ENV] = data_dir
+
+    try:
+        for page_cls in PAGES:
+            frames = golden_frames(page_cls, frames_dir)
+            if not frames:
+                logger.warning("No golden frames for {}".format(page_cls.__name__))
+                continue
+
+            for name in page_properties(page_cls):
+                clear_caches(data_dir, "{}.{}".format(page_cls.__name__, name))
+                for mode, (times, errors) in (
+                    ("cold", measure(page_cls, name, frames, 1)),
+                    ("warm", measure(page_cls, name, frames, repeat)),
+                ):
+                    key = "{}.{}.{}".format(page_cls.__name__, name, mode)
+                    results[key] = dict(
+                        ("p{}".format(p), percentile(times, p) if times else None)
+                        for p in PERCENTILES
+                    )
+                    results[key]["errors"] = len(errors)
+    finally:
+        ocr_cache.cache = default_cache
+        # Glyph sets were learned in the benchmark data directory
+        digit_reader.reset_all()
+        if default_data_dir is None:
+            del os.environ[storage.DATA_DIR_ENV]
+        else:
+            os.environ[storage.DATA_DIR_ENV] = default_data_dir
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    return results
+
+
+def regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Returns list of (key, percentile, baseline secs, current secs) of the
+    COMPARED_PERCENTILES slower than allowed
+    """
+    slower = []
+
+    for key, stats in sorted(results.items()):
+        if key not in baseline:
+            continue
+        for name in ("p{}".format(p) for p in COMPARED_PERCENTILES):
+            before = baseline[key].get(name)
+            if before is None or stats[name] is None:
+                continue
+            if stats[name] > before * (1 + tolerance) + SLACK_SECS:
+                slower.append((key, name, before, stats[name]))
+
+    return slower
+
+
+def failures(results):
+    """Returns list of (key, errors) of the properties that raised"""
+    return [
+        (key, stats["errors"])
+        for key, stats in sorted(results.items())
+        if stats["errors"]
+    ]
+
+
+def report(results):
+    row = "{:<55} {:>10} {:>10} {:>10} {:>7}"
+    print(row.format("property", "p50 ms", "p90 ms", "p99 ms", "errors"))
+    for key, stats in sorted(results.items()):
+        print(
+            row.format(
+                key,
+                *[_ms(stats["p{}".format(p)]) for p in PERCENTILES],
+                stats["errors"]
+            )
+        )
+
+
+def _ms(secs):
+    return "-" if secs is None else "{:.2f}".format(secs * 1000)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", help="directory with <PageClass>/*.png frames")
+    parser.add_argument("--repeat", type=int, default=5, help="warm repetitions")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.frames, args.repeat)
+    report(results)
+
+    failed = failures(results)
+    if failed:
+        for key, errors in failed:
+            print("ERROR {}: {} reads raised".format(key, errors))
+        print("Timings with errors are not compared nor stored as baseline")
+        return 2
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print("Baseline stored in {}".format(args.baseline))
+        return 0
+
+    if not os.path.isfile(args.baseline):
+        print("No baseline found. Run with --update-baseline to store one")
+        return 0
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+
+    slower = regressions(results, baseline, args.tolerance)
+    for key, name, before, now in slower:
+        print(
+            "REGRESSION {} {}: {:.2f} ms -> {:.2f} ms".format(
+                key, name, before * 1000, now * 1000
+            )
+        )
+
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,12 @@
 import time
 
 import stbt
-from common.exceptions import NotInScreen, TimeoutError
+from common.exceptions import TimeoutError
+from common.utils import templates
+from common.utils.carousel import Carousel
+from common.utils.focus_tracker import FocusTracker
+from common.utils.page_object import PageObject, assert_visible
+from common.utils.template_set import TemplateSet
 from common.utils.rcu import RCU
 
 
@@ -30,7 +35,24 @@ class Img:
     TILE_SELECTED = "./images/atleti_tile_selected.png"
 
 
-class Atleti(stbt.FrameObject):
+PILL_STRIP = stbt.Region(80, 595, width=1170, height=65)
+
+# Pills are labelled with their own locator
+PILLS = TemplateSet(
+    [
+        (pill, pill)
+        for pill in [
+            Img.PILL_RESUMEN,
+            Img.PILL_ENTREVISTA,
+            Img.PILL_PROTAGONISTA,
+            Img.PILL_ATLETICO,
+        ]
+    ],
+    __file__,
+)
+
+
+class Atleti(PageObject):
     """Page Object for Atleti
 
     When instantiated, an image capture is done and
@@ -53,7 +75,7 @@ class Atleti(stbt.FrameObject):
 
         region = stbt.Region(95, 35, width=135, height=100)
 
-        logo = stbt.match(Img.LOGO, frame=self._frame, region=region)
+        logo = self._match(Img.LOGO, region=region)
 
         return logo
 
@@ -66,20 +88,22 @@ class Atleti(stbt.FrameObject):
         Returns:
             string: Focused text in ascii. No special characters. None if no pill
         """
-        region = stbt.Region(80, 595, width=1170, height=65)
+        return PILL_FOCUS.focused(self._frame) or False
 
-        pills = [
-            Img.PILL_RESUMEN,
-            Img.PILL_ENTREVISTA,
-            Img.PILL_PROTAGONISTA,
-            Img.PILL_ATLETICO,
-        ]
 
-        for pill in pills:
-            if stbt.match(pill, frame=self._frame, region=region):
-                return pill
+def _locate_pill(frame):
+    """Returns label and region of the focused pill in frame"""
+    result = PILLS.classify(frame, region=PILL_STRIP)
+
+    return result.label, result.match.region if result.match else None
 
-        return False
+
+# Focus is followed from frame to frame. PILLS are only matched for pills
+# not seen yet
+PILL_FOCUS = FocusTracker(PILL_STRIP, _locate_pill)
+
+# PILLS are declared in the order reached pressing RIGHT
+PILL_CAROUSEL = Carousel(PILLS.labels, lambda: Atleti().is_pill_selected or None)
 
 
 def is_visible():
@@ -98,11 +122,30 @@ def assert_screen():
     Returns:
         [obj]: [Returns instance of page]
     """
-    if is_visible():
-        page = Atleti()
-        return page
-    else:
-        raise NotInScreen(__name__)
+    return assert_visible(Atleti, __name__)
+
+
+def launched():
+    """Forgets the pill focused in the previous session of the app
+
+    Called when the app is launched: the focus tracker would otherwise
+    compare the first frames with the last one of the previous session.
+    """
+    PILL_FOCUS.reset()
+
+
+def match_initial_screen(frame=None):
+    """Returns stbt.MatchResult of the initial screen in frame
+
+    Args:
+        frame (stbt.Frame, optional): Defaults to None, a new frame.
+    """
+    result = stbt.match(templates.load(Img.SCREEN_INITIAL, __file__), frame=frame)
+
+    if result:
+        launched()
+
+    return result
 
 
 def get_initial_screen():
@@ -112,10 +155,13 @@ def get_initial_screen():
         boolean: returns True if the initial screen was found within 30 seconds
     """
     try:
-        stbt.wait_for_match(Img.SCREEN_INITIAL, timeout_secs=30)
+        stbt.wait_for_match(
+            templates.load(Img.SCREEN_INITIAL, __file__), timeout_secs=30
+        )
     except stbt.MatchTimeout:
         return False
     else:
+        launched()
         return True
 
 
@@ -131,42 +177,44 @@ def get_splash_screen():
         boolean: returns True if the splash screen was found within 15 seconds
     """
     try:
-        stbt.wait_for_match(Img.SCREEN_SPLASH, timeout_secs=15)
+        stbt.wait_for_match(
+            templates.load(Img.SCREEN_SPLASH, __file__), timeout_secs=15
+        )
     except stbt.MatchTimeout:
         return False
     else:
+        launched()
         return True
 
 
-def select_pill(pill, change_dir=False):
-    """Navigate right until find target pill
-    If not found, tries again pressing LEFT KEY
-    The second run is necessary if we want to select first element,
-    but the second is focused. It will match on the way back
+def select_pill(pill):
+    """Moves from the focused pill to the target one in the shorter direction
+    If the focused pill is not identified, navigates right until finding
+    the target pill and then tries again pressing LEFT KEY
 
     Args:
         pill ([Enum]): [Img.PILL_RESUMEN, Img.PILL_ENTREVISTA,
         Img.PILL_PROTAGONISTA, Img.PILL_ATLETIOO]
     """
-    if change_dir:
+    if PILL_CAROUSEL.select(pill):
+        return
+
+    try:
+        stbt.press_until_match(
+            RCU.RIGHT,
+            templates.load(pill, __file__),
+            max_presses=4,
+            interval_secs=0.8,
+            region=PILL_STRIP,
+        )
+    except stbt.MatchTimeout:
         stbt.press_until_match(
             RCU.LEFT,
-            pill,
+            templates.load(pill, __file__),
             max_presses=4,
             interval_secs=0.8,
-            region=stbt.Region(80, 595, width=1170, height=65),
+            region=PILL_STRIP,
         )
-    else:
-        try:
-            stbt.press_until_match(
-                RCU.RIGHT,
-                pill,
-                max_presses=4,
-                interval_secs=0.8,
-                region=stbt.Region(80, 595, width=1170, height=65),
-            )
-        except stbt.MatchTimeout:
-            select_pill(pill, change_dir=True)
 
 
 def is_continue_popup():
@@ -176,7 +224,7 @@ def is_continue_popup():
         bool: True if detected, else False
     """
     return stbt.match(
-        Img.CONTINUAR,
+        templates.load(Img.CONTINUAR, __file__),
         region=stbt.Region(260, 165, width=755, height=220),
     )
 
@@ -185,7 +233,7 @@ def select_continue():
     """Select Continue"""
     stbt.press_until_match(
         RCU.LEFT,
-        Img.PILL_CONTINUAR,
+        templates.load(Img.PILL_CONTINUAR, __file__),
         max_presses=2,
         interval_secs=0.8,
         region=stbt.Region(318, 370, width=645, height=70),
@@ -196,7 +244,7 @@ def select_start_over():
     """Select Reproducir desde el principio"""
     stbt.press_until_match(
         RCU.RIGHT,
-        Img.PILL_REPRODUCIR_DEL_INICIO,
+        templates.load(Img.PILL_REPRODUCIR_DEL_INICIO, __file__),
         max_presses=2,
         interval_secs=0.8,
         region=stbt.Region(318, 370, width=645, height=70),
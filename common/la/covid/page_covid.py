@@ -3,7 +3,13 @@ import re
 
 import stbt
 from common.exceptions import Error, NotInScreen, NotFound, ArgumentNotValid
+from common.utils import key_timing, templates
+from common.utils.digit_reader import DigitReader
+from common.utils.focus_tracker import FocusTracker
+from common.utils.page_object import PageObject, assert_visible
 from common.utils.rcu import RCU
+from common.utils.settle import CHANGE, wait_for_settle
+from common.utils.template_set import TemplateSet
 
 
 class Img:
@@ -20,7 +26,25 @@ class Img:
     POSITIVE_RESULT = "./images/covid_resultado_positivo.png"
 
 
-class Covid(stbt.FrameObject):
+NUMBER_OF_QUESTIONS = 8
+
+# Times answer_all_questions goes back to the question on screen
+MAX_RESYNCS = 2
+
+OPTIONS_REGION = stbt.Region(125, 420, width=330, height=80)
+PILL_STRIP = stbt.Region(0, 510, width=1280, height=185)
+QUESTION_REGION = stbt.Region(110, 200, width=50, height=40)
+
+# Focused answer option, labelled as in the answers of the questions
+OPTIONS = TemplateSet([("NO", Img.NO_OPT), ("SI", Img.SI_OPT)], __file__)
+
+# Key that moves the focus to the other answer option, from either of them
+OPTION_KEY = RCU.RIGHT
+
+QUESTION_NUMBER = DigitReader("covid_question_number")
+
+
+class Covid(PageObject):
     """Page Object for Covid
 
     When instantiated, an image capture is done and
@@ -43,7 +67,7 @@ class Covid(stbt.FrameObject):
 
         region = stbt.Region(85, 30, width=180, height=100)
 
-        logo = stbt.match(Img.LOGO, frame=self._frame, region=region)
+        logo = self._match(Img.LOGO, region=region)
 
         return logo
 
@@ -52,30 +76,39 @@ class Covid(stbt.FrameObject):
         """Returns ascii string for focused pills
         Does not consider as pill the options SI/NO of the questions asked
 
-        Since pills vary in horizontal size, we detect left and right edges,
-        then make a bounding_box to get the pill region and perform OCR
+        The focus is followed from the previous frame by PILL_FOCUS, so the
+        pill is only located and read with OCR the first time it is seen
 
         Returns:
             string: Focused text in ascii. No special characters. None if no pill
         """
-        region = stbt.Region(0, 510, width=1280, height=185)
+        return PILL_FOCUS.focused(self._frame)
 
-        pill_left = stbt.match(
-            Img.PILL_LEFT,
-            frame=self._frame,
-            region=region,
-        )
+    @property
+    def focused_pill_region(self):
+        """Returns region of the focused pill
 
-        pill_right = stbt.match(
-            Img.PILL_RIGHT,
-            frame=self._frame,
-            region=region,
-        )
+        Since pills vary in horizontal size, we detect left and right edges,
+        then make a bounding_box to get the pill region
+
+        Returns:
+            stbt.Region: pill region. None if no pill
+        """
+        pill_left = self._match(Img.PILL_LEFT, region=PILL_STRIP, track=True)
+
+        pill_right = self._match(Img.PILL_RIGHT, region=PILL_STRIP, track=True)
 
         if not pill_right.match and not pill_left.match:
             return None
 
-        pill_region = stbt.Region.bounding_box(pill_left.region, pill_right.region)
+        return stbt.Region.bounding_box(pill_left.region, pill_right.region)
+
+    def _read_pill(self):
+        """Returns OCR text and region of the focused pill"""
+        pill_region = self.focused_pill_region
+
+        if pill_region is None:
+            return None, None
 
         # For some reason, tesseract does not read well when there is only one word
         # in this capture
@@ -84,13 +117,14 @@ class Covid(stbt.FrameObject):
 
         pill_croped = pill_region.extend(x=24, y=6, right=-25, bottom=-6)
 
-        return stbt.ocr(
-            frame=self._frame,
+        text = self._ocr(
             region=pill_croped,
             lang="spa",
             mode=stbt.OcrMode.SINGLE_LINE,
         )
 
+        return text, pill_region
+
     @property
     def current_question_number(self):
         """Returns OCR number from question
@@ -99,9 +133,21 @@ class Covid(stbt.FrameObject):
         Returns:
             string: raw string with number
         """
-        region = stbt.Region(110, 200, width=50, height=40)
+        return self._read_digits(
+            QUESTION_NUMBER, QUESTION_REGION, mode=stbt.OcrMode.RAW_LINE
+        ).text
+
+    @property
+    def focused_option(self):
+        """Returns focused answer option of the question
+
+        Returns:
+            string: "SI" or "NO". None if no option is focused
+        """
+        return self._classify(OPTIONS, region=OPTIONS_REGION).label
 
-        return stbt.ocr(frame=self._frame, region=region, mode=stbt.OcrMode.RAW_LINE)
+
+PILL_FOCUS = FocusTracker(PILL_STRIP, lambda frame: Covid(frame)._read_pill())
 
 
 def is_visible():
@@ -120,11 +166,16 @@ def assert_screen():
     Returns:
         [obj]: [Returns instance of page]
     """
-    if is_visible():
-        page = Covid()
-        return page
-    else:
-        raise NotInScreen(__name__)
+    return assert_visible(Covid, __name__)
+
+
+def launched():
+    """Forgets the pill focused in the previous session of the app
+
+    Called when the app is launched: the focus tracker would otherwise
+    compare the first frames with the last one of the previous session.
+    """
+    PILL_FOCUS.reset()
 
 
 def get_focused_pill():
@@ -150,15 +201,12 @@ def get_current_question_number():
         int: number of current question if found or None otherwise.
     """
     page = assert_screen()
-    num_raw = page.current_question_number
-    try:
-        num = re.findall(r"\d{1}", num_raw)[0]
-        num = int(num)
-    except ValueError:
-        return None
-    else:
+    num = _question_number(page)
+
+    if num is not None:
         stbt.draw_text("Question: {}".format(str(num)))
-        return num
+
+    return num
 
 
 def get_splash_screen():
@@ -168,13 +216,30 @@ def get_splash_screen():
         boolean: returns True if the splash screen was found within 15 seconds
     """
     try:
-        stbt.wait_for_match(Img.SCREEN_SPLASH, timeout_secs=15)
+        stbt.wait_for_match(
+            templates.load(Img.SCREEN_SPLASH, __file__), timeout_secs=15
+        )
     except stbt.MatchTimeout:
         return False
     else:
+        launched()
         return True
 
 
+def match_initial_screen(frame=None):
+    """Returns stbt.MatchResult of the initial screen in frame
+
+    Args:
+        frame (stbt.Frame, optional): Defaults to None, a new frame.
+    """
+    result = stbt.match(templates.load(Img.SCREEN_INITIAL, __file__), frame=frame)
+
+    if result:
+        launched()
+
+    return result
+
+
 def get_initial_screen():
     """Wait for the initial screen to appear.
 
@@ -182,10 +247,13 @@ def get_initial_screen():
         boolean: returns True if the initial screen was found within 30 seconds
     """
     try:
-        stbt.wait_for_match(Img.SCREEN_INITIAL, timeout_secs=30)
+        stbt.wait_for_match(
+            templates.load(Img.SCREEN_INITIAL, __file__), timeout_secs=30
+        )
     except stbt.MatchTimeout:
         return False
     else:
+        launched()
 
         return True
 
@@ -205,12 +273,12 @@ def select_pill(unicode_text, press_ok=True):
     if not isinstance(unicode_text, unicode):
         raise ArgumentNotValid
 
-    page = assert_screen()
-    focused = get_focused_pill().lower()
+    focused = get_focused_pill()
 
     if focused is None:
         raise NotInScreen(__name__)
 
+    focused = focused.lower()
     unicode_text = unicode_text.lower()
 
     for _ in range(6):
@@ -229,8 +297,7 @@ def select_pill(unicode_text, press_ok=True):
         else:
             stbt.press_and_wait(RCU.RIGHT, stable_secs=0.5)
 
-        page.refresh()
-        focused = get_focused_pill().lower()
+        focused = (get_focused_pill() or "").lower()
 
     stbt.draw_text(
         "Pill Not Found: {}".format(
@@ -244,10 +311,10 @@ def select_option_yes():
     """Select option YES as answer"""
     stbt.press_until_match(
         RCU.RIGHT,
-        Img.SI_OPT,
+        templates.load(Img.SI_OPT, __file__),
         interval_secs=0.5,
         max_presses=3,
-        region=stbt.Region(125, 420, width=330, height=80),
+        region=OPTIONS_REGION,
     )
     stbt.draw_text("Select option: YES")
     stbt.press_and_wait(RCU.OK, stable_secs=0.5)
@@ -257,10 +324,10 @@ def select_option_no():
     """Select option NO as answer"""
     stbt.press_until_match(
         RCU.RIGHT,
-        Img.NO_OPT,
+        templates.load(Img.NO_OPT, __file__),
         interval_secs=0.5,
         max_presses=3,
-        region=stbt.Region(125, 420, width=330, height=80),
+        region=OPTIONS_REGION,
     )
     stbt.draw_text("Select option: NO")
     stbt.press_and_wait(RCU.OK, stable_secs=0.5)
@@ -269,15 +336,22 @@ def select_option_no():
 def answer_all_questions(answers):
     """Reply all questions by sending an array of answers
 
+    Each answer is sent as soon as the previous question is replaced: the
+    focused option is classified, moved with RIGHT if needed and checked
+    once on the frame after the key, and OK is pressed with the key gap of
+    the STB model. The question number is read with the
+    digit reader from the first stable frame after the question changes.
+    If it is not the expected one, answering resumes from the question on
+    screen, up to MAX_RESYNCS times.
+
     Args:
         answers (list): list of integers with 0 for NO and 1 for YES
 
     Raises:
         exceptions.ArgumentNotValid: if any item is not 1 or 0
-        exceptions.ArgumentNotValid: if number of answers is different from 80
+        exceptions.ArgumentNotValid: if number of answers is different from 8
         exceptions.Error: If current number of screen is different from expected
     """
-    NUMBER_OF_QUESTIONS = 8
     page = assert_screen()
 
     if not all(v == 0 or v == 1 for v in answers):
@@ -286,28 +360,85 @@ def answer_all_questions(answers):
     if not len(answers) == NUMBER_OF_QUESTIONS:
         raise ArgumentNotValid
 
-    for question, answer in enumerate(answers, start=1):
-        if answer == 0:
-            select_option_no()
-        else:
-            select_option_yes()
+    question = _question_number(page) or 1
+    resyncs = 0
 
-        question += 1
-        page.refresh()
+    while True:
+        pressed = _answer(page, "SI" if answers[question - 1] else "NO")
 
-        if (
-            question <= NUMBER_OF_QUESTIONS
-            and question != get_current_question_number()
-        ):
+        if question == NUMBER_OF_QUESTIONS:
+            return
+
+        if pressed:
+            wait_for_settle(
+                QUESTION_REGION, mode=CHANGE, consecutive_frames=1, timeout_secs=3
+            )
+        frame = wait_for_settle(QUESTION_REGION, consecutive_frames=2).frame
+
+        page = Covid(frame)
+        current = _question_number(page)
+
+        if current == question + 1:
+            question = current
+            continue
+
+        resyncs += 1
+        if current is None or resyncs > MAX_RESYNCS:
             raise Error("Mismatch between current/expected question number")
 
+        stbt.draw_text(
+            "Expected question {}, resuming from {}".format(question + 1, current)
+        )
+        question = current
+
+
+def _answer(page, option):
+    """Selects option in the question of page
+
+    Args:
+        page (Covid): page with the question
+        option (str): "SI" or "NO"
+
+    Returns:
+        bool: True if the keys were sent without waiting for the screen
+    """
+    focused = page.focused_option
+    interval_secs = key_timing.get_profile().key_gap_secs
+
+    if focused is not None and focused != option:
+        stbt.press(OPTION_KEY, interpress_delay_secs=interval_secs)
+        # Checked once: if the focus is not there yet, the search below
+        # waits for it before pressing again
+        focused = Covid().focused_option
+
+    if focused != option:
+        # Focus not identified or not moved, search it
+        if option == "SI":
+            select_option_yes()
+        else:
+            select_option_no()
+        return False
+
+    stbt.press(RCU.OK, interpress_delay_secs=interval_secs)
+    stbt.draw_text("Select option: {}".format(option))
+
+    return True
+
+
+def _question_number(page):
+    """Returns number of the question in page. None if not read"""
+    try:
+        return int(re.findall(r"\d{1}", page.current_question_number)[0])
+    except (IndexError, TypeError, ValueError):
+        return None
+
 
 def assert_negative_diagnosis():
     """Detect screen for negative diagnosis"""
     assert_screen()
     assert stbt.wait_until(
         lambda: stbt.match(
-            Img.NEGATIVE_RESULT,
+            templates.load(Img.NEGATIVE_RESULT, __file__),
             region=stbt.Region(95, 110, width=590, height=190),
         )
     )
@@ -318,7 +449,7 @@ def assert_positive_diagnosis():
     assert_screen()
     assert stbt.wait_until(
         lambda: stbt.match(
-            Img.POSITIVE_RESULT,
+            templates.load(Img.POSITIVE_RESULT, __file__),
             region=stbt.Region(95, 110, width=590, height=190),
         )
     )
@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
-import time
 import logging
 
 import numpy as np
 import stbt
-from common.exceptions import NotInScreen, NotFound
+from common.exceptions import NotFound
+from common.utils import templates
 from common.utils.get_time_and_date import GetTimeAndDate
+from common.utils.page_object import PageObject, assert_visible
+from common.utils.navigation_utils import send_key_burst
+from common.utils.settle import wait_for_settle
 from common.utils.rcu import RCU
 
 logger = logging.getLogger(__file__)
@@ -23,6 +26,19 @@ AJUSTES.append(AJUSTES_R2)
 AJUSTES.append(AJUSTES_R3)
 AJUSTES.append(AJUSTES_R4)
 
+# Index of AJUSTES: item -> (row, column)
+AJUSTES_INDEX = dict(
+    (item, (i, j)) for i, row in enumerate(AJUSTES) for j, item in enumerate(row)
+)
+
+# Pixels around a known cell where its highlight is searched
+CELL_MARGIN = 10
+
+# Focus cell left by the last access_ajustes, and regions where the
+# highlight of each cell was found
+_focused_cell = None
+_cell_regions = {}
+
 
 class Img:
     """List of reference images locators"""
@@ -31,7 +47,7 @@ class Img:
     SELECTED = "./images/ajustes_selection.png"
 
 
-class Ajustes(stbt.FrameObject):
+class Ajustes(PageObject):
     """Page Object for Ajustes
 
     When instantiated, an image capture is done and
@@ -54,16 +70,35 @@ class Ajustes(stbt.FrameObject):
         logo_img = Img.LOGO
         select_img = Img.SELECTED
 
-        logo = stbt.match(
+        logo = self._match(
             logo_img,
-            frame=self._frame,
             region=stbt.Region(1125, 25, width=115, height=65),
         )
 
-        selection = stbt.match(select_img, frame=self._frame)
+        selection = self._match(select_img, track=True)
 
         return logo and selection
 
+    @property
+    def selected(self):
+        """Returns text of focused element in screen
+
+        Returns:
+            str: text from selected item menu. None if selection is not found
+        """
+        selection = self._match(Img.SELECTED, track=True)
+
+        if not selection:
+            return None
+
+        return self._ocr(
+            region=selection.region,
+            text_color=(255, 249, 182),
+            text_color_threshold=80,
+            mode=stbt.OcrMode.SPARSE_TEXT_WITH_OSD,
+            lang="spa",
+        )
+
 
 def is_visible():
     """Check if in Ajustes
@@ -81,48 +116,64 @@ def assert_screen():
     Returns:
         [obj]: [Returns instance of page]
     """
-    if is_visible():
-        page = Ajustes()
-        return page
-    else:
-        raise NotInScreen(__name__)
+    return assert_visible(Ajustes, __name__)
 
 
 def access_ajustes(target_item):
     """Access Ajustes item from the ones defined in AJUSTES 2d matrix
-       Finds current selected element indexes
-       Finds target element indexes
-       Subtract both elements to find needed RCU commands to reach target
+       Starts from the focus cell left by the previous call, or reads the
+       selected element if unknown
+       Subtract both cells to find needed RCU commands to reach target and
+       sends them in a single burst
+       Verifies the highlight in the landing cell only. If the cached focus
+       was stale, reads the selected element and tries again
 
     Args:
         target_item ([string]): [key from AJUSTES 2d matrix]
     """
-    if is_visible():
-        selected_item = selected()
-        stbt.draw_text("Navigating to {} from {}".format(target_item, selected_item))
+    global _focused_cell
 
-        selected_index = _aux_get_2d_index(selected_item)
+    if is_visible():
         target_index = _aux_get_2d_index(target_item)
+        selected_index = _focused_cell or _aux_get_2d_index(selected())
 
-        directions = np.subtract(target_index, selected_index)
+        stbt.draw_text(
+            "Navigating to {} from {}".format(target_item, _label(selected_index))
+        )
 
-        vertical = directions[0]
-        horizontal = directions[1]
+        for _ in range(2):
+            vertical, horizontal = np.subtract(target_index, selected_index)
 
-        _matrix_nav(horizontal, vertical)
+            _matrix_nav(horizontal, vertical)
 
-        time.sleep(1)
-        if selected() == target_item:
-            stbt.press_and_wait(
-                RCU.OK,
-                region=stbt.Region.ALL,
-                timeout_secs=3,
-                stable_secs=1,
-            )
+            if _is_focused(target_item, target_index):
+                break
+
+            _focused_cell = None
+            selected_index = _aux_get_2d_index(selected())
         else:
             stbt.draw_text("Could not reach element")
             raise NotFound()
 
+        _focused_cell = target_index
+        stbt.press_and_wait(
+            RCU.OK,
+            region=stbt.Region.ALL,
+            timeout_secs=3,
+            stable_secs=1,
+        )
+
+
+def forget_focus():
+    """Forgets the focus cell left by the last access_ajustes
+
+    Called when Ajustes is entered: the focus of a previous visit may not
+    be kept, so the next access_ajustes reads the selected element.
+    """
+    global _focused_cell
+
+    _focused_cell = None
+
 
 def selected():
     """Returns text of focused element in scree
@@ -130,15 +181,7 @@ def selected():
     Returns:
         str: text from selected item menu
     """
-    select_img = Img.SELECTED
-    selection = stbt.match(select_img)
-    return stbt.ocr(
-        region=selection.region,
-        text_color=(255, 249, 182),
-        text_color_threshold=80,
-        mode=stbt.OcrMode.SPARSE_TEXT_WITH_OSD,
-        lang="spa",
-    )
+    return Ajustes().selected
 
 
 def get_time_and_date():
@@ -158,39 +201,75 @@ def _aux_get_2d_index(item):
     Args:
         item (str): item
 
+    Raises:
+        NotFound: if item is not in AJUSTES
+
     Returns:
         tuple: i, j index for 2d matrix in which this item is placed
     """
-    for i, e in enumerate(AJUSTES):
-        try:
-            return i, e.index(item)
-        except ValueError:
-            pass
-    logger.error("Element not foun: {}".format(item))
-    logger.error(
-        "Item not found: '{}'\nCheck valid values in MENU dictionary in {}".format(
-            item, __name__
+    try:
+        return AJUSTES_INDEX[item]
+    except KeyError:
+        logger.error(
+            "Item not found: '{}'\nCheck valid values in AJUSTES matrix in {}".format(
+                item, __name__
+            )
         )
-    )
+        raise NotFound(item)
+
+
+def _label(index):
+    """Returns AJUSTES item in index"""
+    i, j = index
+    return AJUSTES[i][j]
+
+
+def _is_focused(item, index):
+    """Checks if the highlight is in the cell of item
+
+    Once the region of the cell is known, only the highlight is matched,
+    around that region. Otherwise waits for the menu to settle, reads the
+    selected element and remembers its region
+
+    Args:
+        item (str): item
+        index (tuple): i, j index of item
+
+    Returns:
+        bool: True if item is focused
+    """
+    region = _cell_regions.get(index)
+
+    if region is not None:
+        window = region.extend(
+            x=-CELL_MARGIN, y=-CELL_MARGIN, right=CELL_MARGIN, bottom=CELL_MARGIN
+        )
+        selection = templates.load(Img.SELECTED, __file__)
+        return bool(
+            stbt.wait_until(
+                lambda: stbt.match(selection, region=window), timeout_secs=2
+            )
+        )
+
+    wait_for_settle(timeout_secs=3, replaces_secs=1)
+
+    page = Ajustes()
+
+    if page.selected != item:
+        return False
+
+    _cell_regions[index] = page._match(Img.SELECTED, track=True).region
+
+    return True
 
 
 def _matrix_nav(horizontal, vertical):
     """Navigates towards desired item in the 2d matrix menu
+    All the presses are sent as a burst with the key gap of the STB model
 
     Args:
         horizontal (int): number of horizontal movements
         vertical (int): number of vertical movements
     """
-    if vertical > 0:
-        for _ in range(vertical):
-            stbt.press(RCU.DOWN)
-    else:
-        for _ in range(abs(vertical)):
-            stbt.press(RCU.UP)
-
-    if horizontal > 0:
-        for _ in range(horizontal):
-            stbt.press(RCU.RIGHT)
-    else:
-        for _ in range(abs(horizontal)):
-            stbt.press(RCU.LEFT)
+    send_key_burst(RCU.DOWN if vertical > 0 else RCU.UP, abs(vertical))
+    send_key_burst(RCU.RIGHT if horizontal > 0 else RCU.LEFT, abs(horizontal))
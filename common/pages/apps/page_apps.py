@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 import stbt
-from common.exceptions import NotInScreen
+from common.utils import templates
+from common.utils.carousel import Carousel
+from common.utils.digit_reader import DigitReader
+from common.utils.page_object import PageObject, assert_visible
 from common.utils.rcu import RCU
 
 
@@ -12,6 +15,13 @@ class Img:
     SELECTION = IMAGES_DIR + "selection.png"
 
 
+# Both counters of the category ("3 de 12") share the same font
+COUNTER = DigitReader("apps_counter")
+
+# Position in the row (first counter) where each app was last found
+APP_POSITIONS = {}
+
+
 class App:
     COVID = "./images/apps_covid.png"
     ATLETI = "./images/apps_atleti.png"
@@ -27,7 +37,7 @@ class Category:
     EMPRENDEDORES = "Emprendedores"
 
 
-class Apps(stbt.FrameObject):
+class Apps(PageObject):
     """Page Object for Apps
 
     When instantiated, an image capture is done and
@@ -51,15 +61,14 @@ class Apps(stbt.FrameObject):
         region1 = stbt.Region(65, 40, width=95, height=40)
         region2 = stbt.Region(80, 375, width=285, height=175)
 
-        apps_text = stbt.match_text(
-            "Apps", frame=self._frame, region=region1, mode=stbt.OcrMode.SINGLE_WORD
+        apps_text = self._match_text(
+            "Apps", region=region1, mode=stbt.OcrMode.SINGLE_WORD
         ).match
 
         match_parameters = stbt.MatchParameters(confirm_method=None)
 
-        selection = stbt.match(
+        selection = self._match(
             Img.SELECTION,
-            frame=self._frame,
             match_parameters=match_parameters,
             region=region2,
         )
@@ -68,8 +77,7 @@ class Apps(stbt.FrameObject):
 
     @property
     def category(self):
-        return stbt.ocr(
-            frame=self._frame,
+        return self._ocr(
             region=stbt.Region(85, 335, width=320, height=45),
             lang="spa",
             mode=stbt.OcrMode.SPARSE_TEXT_WITH_OSD,
@@ -77,11 +85,11 @@ class Apps(stbt.FrameObject):
 
     @property
     def current_selected_in_category(self):
-        current = stbt.ocr(
-            frame=self._frame,
-            region=stbt.Region(1123, 350, width=19, height=18),
+        current = self._read_digits(
+            COUNTER,
+            stbt.Region(1123, 350, width=19, height=18),
             mode=stbt.OcrMode.RAW_LINE,
-        )
+        ).text
 
         try:
             current = int(current)
@@ -92,11 +100,11 @@ class Apps(stbt.FrameObject):
 
     @property
     def total_in_category(self):
-        total = stbt.ocr(
-            frame=self._frame,
-            region=stbt.Region(1171, 350, width=19, height=18),
+        total = self._read_digits(
+            COUNTER,
+            stbt.Region(1171, 350, width=19, height=18),
             mode=stbt.OcrMode.RAW_LINE,
-        )
+        ).text
 
         try:
             total = int(total)
@@ -122,11 +130,7 @@ def assert_screen():
     Returns:
         [obj]: [Returns instance of page]
     """
-    if is_visible():
-        page = Apps()
-        return page
-    else:
-        raise NotInScreen(__name__)
+    return assert_visible(Apps, __name__)
 
 
 def get_category():
@@ -146,8 +150,8 @@ def get_total_in_category():
 
 def navigate_to_category(category):
     # Type checking
-    if not isinstance(category, Category):
-        raise TypeError("category must be an instance of Category Enum")
+    if category not in _values(Category):
+        raise TypeError("category must be a value of Category")
 
     assert_screen()
 
@@ -162,15 +166,51 @@ def navigate_to_category(category):
 
 
 def navigate_to_app(app):
+    """Focus app in the current category row
+    Once an app is found its position is remembered, so the next time the
+    row is moved in the shorter direction in a single burst. Apps with
+    unknown position are searched pressing RIGHT
+
+    Args:
+        app (str): value of App
+
+    Returns:
+        stbt.MatchResult: match of the focused app
+    """
     # Type checking
-    if not isinstance(app, App):
-        raise TypeError("app must be an instance of App Enum")
+    if app not in _values(App):
+        raise TypeError("app must be a value of App")
 
-    assert_screen()
+    page = assert_screen()
+
+    region = stbt.Region(80, 375, width=285, height=175)
+    image = templates.load(app, __file__)
+    position = APP_POSITIONS.get(app)
+    total = page.total_in_category
+
+    if position is not None and total and position <= total:
+        row = Carousel(
+            range(1, total + 1), lambda: Apps().current_selected_in_category
+        )
+        if row.select(position):
+            match = stbt.match(image, region=region)
+            if match:
+                return match
 
-    stbt.press_until_match(
+        APP_POSITIONS.pop(app, None)
+
+    match = stbt.press_until_match(
         RCU.RIGHT,
-        app,
+        image,
         interval_secs=0.8,
-        region=stbt.Region(80, 375, width=285, height=175),
+        max_presses=total or 10,
+        region=region,
     )
+    APP_POSITIONS[app] = Apps().current_selected_in_category
+
+    return match
+
+
+def _values(cls):
+    """Returns values of the constants declared in cls"""
+    return [value for name, value in vars(cls).items() if not name.startswith("_")]
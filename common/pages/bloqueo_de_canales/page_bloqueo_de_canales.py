@@ -4,10 +4,13 @@ import logging
 
 import stbt
 
-from common.exceptions import NotInScreen
 from common.pages.ajustes import page_ajustes
+from common.utils.digit_reader import DigitReader
+from common.utils import templates
 from common.utils.get_time_and_date import GetTimeAndDate
+from common.utils.navigation_utils import send_key_burst
 from common.utils.ocr_corrections import apply_ocr_corrections
+from common.utils.page_object import PageObject, assert_visible
 from common.utils.rcu import RCU
 
 logger = logging.getLogger(__file__)
@@ -25,6 +28,8 @@ class Img:
 # Max channel reference for loop through channels' list
 MAX_CHANNELS = 85
 
+CHANNEL_NUMBER = DigitReader("bloqueo_de_canales_channel_number")
+
 
 class CaptureElement:
     """Options to capture elements in block screen. Used by _preliminar_region()"""
@@ -34,7 +39,7 @@ class CaptureElement:
     BLOCKED_ICON = 2
 
 
-class BlockChannels(stbt.FrameObject):
+class BlockChannels(PageObject):
     """Page Object for BlockChannels
 
     When instantiated, an image capture is done and
@@ -60,9 +65,8 @@ class BlockChannels(stbt.FrameObject):
         title = "Bloqueo de canales"
         region = stbt.Region(60, 30, width=390, height=55)
 
-        return stbt.match_text(
+        return self._match_text(
             title,
-            frame=self._frame,
             region=region,
             mode=stbt.OcrMode.SPARSE_TEXT_WITH_OSD,
             lang="spa",
@@ -75,23 +79,24 @@ class BlockChannels(stbt.FrameObject):
         Returns:
             [int]: channel number
         """
-        region = _preliminar_region(Img.FOCUSED_NUMBER, CaptureElement.CH_NUMBER)
+        region = _preliminar_region(
+            Img.FOCUSED_NUMBER, CaptureElement.CH_NUMBER, page=self
+        )
 
         if region:
-            channel = stbt.ocr(
-                frame=self._frame,
-                region=stbt.Region(
-                    region[0], region[1], width=region[2], height=region[3]
-                ),
+            channel = self._read_digits(
+                CHANNEL_NUMBER,
+                stbt.Region(region[0], region[1], width=region[2], height=region[3]),
                 mode=stbt.OcrMode.RAW_LINE,
-            )
+            ).text
 
             corrections = {re.compile(r"[oO]"): "0"}
 
             try:
                 ch = int(apply_ocr_corrections(channel, corrections=corrections))
             except Exception as e:
-                logger.error(e, " Failed to get channel")
+                logger.error("{} Failed to get channel".format(e))
+                return None
 
             return ch
 
@@ -116,21 +121,29 @@ def assert_screen():
     Returns:
         [obj]: [Returns instance of page]
     """
-    if is_in_page():
-        page = BlockChannels()
-        return page
-    else:
-        raise NotInScreen(__name__)
+    return assert_visible(BlockChannels, __name__)
 
 
-def navigate_to_channel(channel):
-    """Navigates down to channel list until reach some of the following conditions:
-        - finds target channel
-        - reaches the MAX_CHANNELS navigation repetition
-        - current channel is bigger than target
+def navigate_to_channel(channel, page_size=None):
+    """Navigates the channel list to the target channel
+
+    Reads the focused channel once and jumps as many rows as the channel
+    distance. Channel numbers grow at least one per row, so the jump never
+    falls short of the target. If the list has gaps and the jump overshoots,
+    the target row is searched by halving the interval between the last
+    rows known to be below and above the target. Each step sends its keys
+    as a burst and reads the landing channel once.
+    A jump that lands on a channel out of order (not above the last one
+    after moving down, not below it after moving up, or outside the
+    interval) went past the end or the start of the list, where the list
+    wraps around or the focus stops. Rows are not in order across that
+    point, so the focus moves one row at a time from where it landed: the
+    list is in order from there up to the target.
 
     Args:
         channel (int): target channel number
+        page_size (int, optional): rows moved by CHANNELUP/CHANNELDOWN, if the
+        list supports page jumps. Defaults to None (row by row).
 
     Returns:
         [boolean]: True if channl is found
@@ -139,24 +152,104 @@ def navigate_to_channel(channel):
 
     stbt.draw_text("Navigating to channel {}".format(channel))
 
+    row = 0
+    current = screen.ch_number_focused
+    below = above = None
+    # Rows moved per step once the list wrapped. None while jumping
+    step = None
+    wrapped = False
+
     for _ in range(MAX_CHANNELS):
-        if screen.ch_number_focused == channel:
+        if current is None:
+            logger.error("Channel not detected by OCR")
+            return False
+
+        if current == channel:
             ch_name = _channel_name()
             logger.info("Channel {} - {} found".format(channel, ch_name))
             stbt.draw_text("Channel {} - {} found".format(channel, ch_name))
             return True
-        elif screen.ch_number_focused < channel:
-            stbt.press_and_wait(RCU.DOWN, stable_secs=0.2)
+
+        if step is None and not wrapped:
+            if current < channel:
+                wrapped = below is not None and current <= below[1]
+                below = (row, current)
+            else:
+                wrapped = above is not None and current >= above[1]
+                above = (row, current)
+
+        if wrapped:
+            if step is not None:
+                # One row wrapped or did not move: not in the list
+                break
+            stbt.draw_text("Channel list wrapped, stepping from {}".format(current))
+            step = 1 if current < channel else -1
+
+        if step is not None:
+            if (current < channel) != (step > 0):
+                # Stepped past the target: not in the list
+                break
+            target_row = row + step
+        elif below is not None and above is not None:
+            if above[0] - below[0] <= 1:
+                # Target is between two consecutive rows: not in the list
+                break
+            target_row = (below[0] + above[0]) // 2
         else:
-            logger.error("WARNING: Channel {} not found".format(channel))
-            return False
+            target_row = row + channel - current
+
+        previous = (row, current)
+        _move_rows(target_row - row, page_size)
+        row = target_row
 
         screen = screen.refresh()
+        current = screen.ch_number_focused
+        wrapped = current is not None and _wrapped(previous, row, current)
 
     logger.error("WARNING: Channel {} not found".format(channel))
     return False
 
 
+def _wrapped(previous, row, current):
+    """Returns True if moving from previous (row, channel) to row, where
+    current is focused, went past the end or the start of the list or did
+    not move
+    """
+    moved = row - previous[0]
+
+    return (moved > 0 and current <= previous[1]) or (
+        moved < 0 and current >= previous[1]
+    )
+
+
+def _move_rows(rows, page_size=None):
+    """Moves the focus rows down (positive) or up (negative) in a key burst
+    and waits for the list to be stable after the last key
+
+    Args:
+        rows (int): number of rows
+        page_size (int, optional): rows moved by CHANNELUP/CHANNELDOWN.
+        Defaults to None.
+    """
+    key, page_key = (RCU.DOWN, RCU.CHANNELDOWN) if rows > 0 else (RCU.UP, RCU.CHANNELUP)
+    rows = abs(rows)
+
+    pages = rows // page_size if page_size else 0
+    rows -= pages * (page_size or 0)
+
+    if rows:
+        send_key_burst(page_key, pages)
+        send_key_burst(key, rows - 1)
+        last_key = key
+    elif pages:
+        send_key_burst(page_key, pages - 1)
+        last_key = page_key
+    else:
+        return
+
+    stbt.press_and_wait(last_key, stable_secs=0.2)
+
+
 def block_channel():
     """Blocks focused channel inside Bloqueo de canales"
 
@@ -194,11 +287,13 @@ def confirm_changes_popup(save_changes=True):
     assert_screen()
 
     region = stbt.Region(515, 390, width=245, height=75)
+    accept = templates.load(Img.ACCPEPT_CONFIRMATION, __file__)
+    cancel = templates.load(Img.CANCEL_CONFIRMATION, __file__)
 
     # If confirmation pop-up is not displayed, press EXIT to meke it appear
     if not stbt.wait_until(
-        lambda: stbt.match(Img.ACCPEPT_CONFIRMATION, region=region)
-        or stbt.match(Img.CANCEL_CONFIRMATION, region=region),
+        lambda: stbt.match(accept, region=region)
+        or stbt.match(cancel, region=region),
         timeout_secs=0.5,
     ):
         stbt.press_and_wait(RCU.EXIT, stable_secs=0.5)
@@ -208,19 +303,19 @@ def confirm_changes_popup(save_changes=True):
 
     if save_changes:
         stbt.press_until_match(
-            RCU.RIGHT, Img.ACCPEPT_CONFIRMATION, interval_secs=1, max_presses=3
+            RCU.RIGHT, accept, interval_secs=1, max_presses=3
         )
         stbt.press_and_wait(RCU.OK, stable_secs=0.5)
     else:
         stbt.press_until_match(
-            RCU.RIGHT, Img.CANCEL_CONFIRMATION, interval_secs=1, max_presses=3
+            RCU.RIGHT, cancel, interval_secs=1, max_presses=3
         )
         stbt.press_and_wait(RCU.OK, stable_secs=0.5)
 
     page_ajustes.assert_screen()
 
 
-def _preliminar_region(img, target=CaptureElement.CH_NUMBER):
+def _preliminar_region(img, target=CaptureElement.CH_NUMBER, page=None):
     """Auxiliar function to find focused channel based in image recognition
     of the blue color channel
 
@@ -228,6 +323,8 @@ def _preliminar_region(img, target=CaptureElement.CH_NUMBER):
         img (png): Image ot be used to find a reference point in the screen
         to apply offset
         target (str, optional): [description]. Defaults to CaptureElement.CH_NUMBER.
+        page (BlockChannels, optional): page whose frame is analysed.
+        Defaults to a new capture.
 
     Returns:
         [type]: [description]
@@ -245,7 +342,10 @@ def _preliminar_region(img, target=CaptureElement.CH_NUMBER):
         erode_passes=None,
     )
 
-    preliminar = stbt.match(img, region=region, match_parameters=match)
+    if page is None:
+        page = BlockChannels()
+
+    preliminar = page._match(img, region=region, match_parameters=match)
 
     if preliminar.region and target == CaptureElement.CH_NUMBER:
         x = reg_x
@@ -281,10 +381,13 @@ def _channel_name():
     Returns:
         str: channel name
     """
-    region = _preliminar_region(Img.FOCUSED_NUMBER, target=CaptureElement.CH_NAME)
+    page = BlockChannels()
+    region = _preliminar_region(
+        Img.FOCUSED_NUMBER, target=CaptureElement.CH_NAME, page=page
+    )
 
     if region:
-        return stbt.ocr(
+        return page._ocr(
             region=stbt.Region(region[0], region[1], width=region[2], height=region[3]),
             mode=stbt.OcrMode.SPARSE_TEXT_WITH_OSD,
         )
@@ -298,10 +401,13 @@ def _is_blocked():
     Returns:
         bool: True if blocked, False otherwise
     """
-    region = _preliminar_region(Img.FOCUSED_NUMBER, target=CaptureElement.BLOCKED_ICON)
+    page = BlockChannels()
+    region = _preliminar_region(
+        Img.FOCUSED_NUMBER, target=CaptureElement.BLOCKED_ICON, page=page
+    )
 
     if region:
-        return stbt.match(
+        return page._match(
             Img.BLOCKED_ICON,
             region=stbt.Region(region[0], region[1], width=region[2], height=region[3]),
         )
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import itertools
 import re
 import time
 
@@ -8,8 +9,12 @@ from common.exceptions import NotInScreen
 from common.pages.guia import page_guia
 from common.pages.home import page_home
 from common.pages.pin import page_pin
+from common.utils import key_timing
+from common.utils.digit_reader import DigitReader
 from common.utils.rcu import RCU
 from common.utils.navigation_utils import send_num_rcu_keys
+from common.utils.page_object import PageObject
+from common.utils.template_set import TemplateSet
 
 
 class Img:
@@ -36,6 +41,8 @@ class Img:
     MOTION_MASK = "./images/en_vivo_motion_mask.png"
 
 
+CHANNEL_NUMBER = DigitReader("en_vivo_channel_number")
+
 parental_list = [
     Img.PARENTAL_TP,
     Img.PARENTAL_07,
@@ -44,8 +51,14 @@ parental_list = [
     Img.PARENTAL_18,
 ]
 
+# Parental icons labelled with their rate: "TP", "7", "12", "16" or "18"
+PARENTAL = TemplateSet(
+    [(re.findall(r"\d{1,2}|TP", parental)[0], parental) for parental in parental_list],
+    __file__,
+)
+
 
-class EnVivo(stbt.FrameObject):
+class EnVivo(PageObject):
     """Page Object for EnVivo
 
     When instantiated, an image capture is done and
@@ -70,12 +83,21 @@ class EnVivo(stbt.FrameObject):
 
         region2 = stbt.Region(308, 640, width=660, height=75)
 
-        bar = stbt.match(Img.ROGRESS_BAR, frame=self._frame, region=region1)
+        bar = self._match(Img.PROGRESS_BAR, region=region1)
 
-        ok = stbt.match(Img.OK_ICON, frame=self._frame, region=region2)
+        ok = self._match(Img.OK_ICON, region=region2)
 
         return bar and ok
 
+    @property
+    def is_selecting_channel(self):
+        """Returns True if the channel box is focused: a channel is being
+        selected, with the channel list or typed digits, and is not tuned yet
+        """
+        region = stbt.Region(40, 390, width=210, height=200)
+
+        return self._match(Img.CHANNEL_FOCUS, region=region)
+
     @property
     def parental(self):
         """Returns parental if found
@@ -83,15 +105,9 @@ class EnVivo(stbt.FrameObject):
         Returns:
             string: parental rate
         """
-        for parental in parental_list:
-            if stbt.match(
-                parental,
-                frame=self._frame,
-                region=stbt.Region(244, 470, width=750, height=70),
-            ):
-                return re.findall(r"\d{1,2}|TP", parental)[0]
+        region = stbt.Region(244, 470, width=750, height=70)
 
-        return None
+        return self._classify(PARENTAL, region=region).label
 
     @property
     def channel_number(self):
@@ -100,7 +116,9 @@ class EnVivo(stbt.FrameObject):
         Returns:
             int: channel
         """
-        ch = stbt.ocr(region=stbt.Region(77, 505, width=135, height=55))
+        region = stbt.Region(77, 505, width=135, height=55)
+
+        ch = self._read_digits(CHANNEL_NUMBER, region).text
 
         try:
             return int(ch)
@@ -114,15 +132,7 @@ def is_visible():
     Returns:
         [boolean]: [Returns True if in EnVivo]
     """
-    en_vivo = EnVivo()
-
-    if not en_vivo.is_visible:
-        stbt.press(RCU.OK)
-        time.sleep(1)
-
-    en_vivo = en_vivo.refresh()
-
-    return en_vivo.is_visible
+    return _open_miniguide().is_visible
 
 
 def assert_screen():
@@ -131,11 +141,12 @@ def assert_screen():
     Returns:
         [obj]: [Returns instance of page]
     """
-    if is_visible():
-        page = EnVivo()
+    page = _open_miniguide()
+
+    if page.is_visible:
         return page
-    else:
-        raise NotInScreen(__name__)
+
+    raise NotInScreen(__name__)
 
 
 def parental():
@@ -181,7 +192,12 @@ def zap_to_ch(ch, unblock=True, pin=None):
 
     send_num_rcu_keys(digit_list)
 
-    time.sleep(5)
+    # Returns once zapped or asked for the PIN, at most the commit time.
+    # The typed digits are shown before the zap, so they are not enough
+    stbt.wait_until(
+        lambda: _is_zapped(ch) or page_pin.is_visible(),
+        timeout_secs=key_timing.get_profile().commit_secs,
+    )
 
     _check_live_state(unblock, pin)
 
@@ -227,6 +243,45 @@ def go_to_live(unblock=True, pin=None):
         _check_live_state(unblock, pin)
 
 
+def calibrate_key_timing(channels=(12, 21)):
+    """Measures the key gap and the commit time of the numeric entry and
+    stores them as timing profile of the STB model.
+    Zaps alternately to channels, which must have 2 or more digits and must
+    not be blocked. Trials with a too short key gap zap to other channels,
+    so the channel on screen before calibrating is tuned again at the end
+
+    Args:
+        channels (tuple, optional): channel numbers. Defaults to (12, 21).
+
+    Returns:
+        TimingProfile: calibrated profile
+    """
+    go_to_live()
+    start_ch = assert_screen().channel_number
+
+    targets = itertools.cycle(channels)
+    timeout_secs = key_timing.DEFAULT_PROFILE.commit_secs * 2
+
+    def trial(gap):
+        ch = next(targets)
+        send_num_rcu_keys([int(i) for i in str(ch)], interval_secs=gap)
+        start = time.time()
+
+        for frame in stbt.frames(timeout_secs=timeout_secs):
+            if _is_zapped(ch, frame):
+                return frame.time - start
+
+        return None
+
+    try:
+        return key_timing.calibrate(trial)
+    finally:
+        if start_ch is None:
+            stbt.draw_text("Channel before calibrating not read, not restored")
+        else:
+            zap_to_ch(start_ch, unblock=False)
+
+
 def get_channel_number():
     """Returns channel number from miniguide if OCR has succeeded
 
@@ -251,6 +306,44 @@ def assert_motion():
     )
 
 
+def _is_zapped(ch, frame=None):
+    """Returns True if the channel banner shows channel ch tuned
+
+    The digits typed are shown in the channel box before the zap is
+    committed. The channel is only tuned once the banner is shown without
+    the focus on the channel box.
+
+    Args:
+        ch (int): channel number
+        frame (stbt.Frame, optional): Defaults to None, a new frame.
+    """
+    page = EnVivo(frame)
+
+    return (
+        page.is_visible
+        and not page.is_selecting_channel
+        and page.channel_number == ch
+    )
+
+
+def _open_miniguide():
+    """Returns EnVivo page. If miniguide is not visible, tries to open it
+    and captures the page until it is visible, for 1 second at most
+
+    Returns:
+        EnVivo: page object
+    """
+    en_vivo = EnVivo()
+
+    if not en_vivo.is_visible:
+        stbt.press(RCU.OK)
+        # The miniguide is drawn over live video, so wait for the page
+        # itself instead of a stable screen
+        en_vivo = stbt.wait_until(EnVivo, timeout_secs=1)
+
+    return en_vivo
+
+
 def _check_live_state(unblock, pin):
     """Handles if channel is blocked before checking live screen
 
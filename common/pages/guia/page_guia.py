@@ -5,9 +5,11 @@ import logging
 
 import stbt
 
-from common.exceptions import NotInScreen
+from common.utils.digit_reader import DigitReader
 from common.utils.get_time_and_date import GetTimeAndDate
+from common.utils.page_object import PageObject, assert_visible
 from common.utils.rcu import RCU
+from common.utils.template_set import TemplateSet
 
 logger = logging.getLogger(__file__)
 
@@ -30,6 +32,16 @@ class Img:
     PARENTAL_18 = "./images/guia_parental_18.png"
 
 
+# Properties read from Guide by get_event_metadata()
+EVENT_METADATA = (
+    "event_title",
+    "parental",
+    "exihbition_times",
+    "channel_number",
+    "hd",
+    "dolby",
+)
+
 parental_list = [
     Img.PARENTAL_TP,
     Img.PARENTAL_07,
@@ -38,8 +50,16 @@ parental_list = [
     Img.PARENTAL_18,
 ]
 
+CHANNEL_NUMBER = DigitReader("guia_channel_number")
+
+# Parental icons labelled with their rate: "TP", "7", "12", "16" or "18"
+PARENTAL = TemplateSet(
+    [(re.findall(r"\d{1,2}|TP", parental)[0], parental) for parental in parental_list],
+    __file__,
+)
+
 
-class Guide(stbt.FrameObject):
+class Guide(PageObject):
     """Page Object for Guide
 
     When instantiated, an image capture is done and
@@ -62,9 +82,9 @@ class Guide(stbt.FrameObject):
 
         region = stbt.Region(0, 0, width=1280, height=100)
 
-        title = stbt.match(Img.PAGE_TITLE, frame=self._frame, region=region)
+        title = self._match(Img.PAGE_TITLE, region=region)
 
-        logo = stbt.match(Img.LOGO, frame=self._frame, region=region)
+        logo = self._match(Img.LOGO, region=region)
 
         return title and logo
 
@@ -73,7 +93,9 @@ class Guide(stbt.FrameObject):
 
         region = stbt.Region(130, 645, width=110, height=35)
 
-        ch = stbt.ocr(frame=self._frame, region=region, mode=stbt.OcrMode.RAW_LINE)
+        ch = self._read_digits(
+            CHANNEL_NUMBER, region, mode=stbt.OcrMode.RAW_LINE
+        ).text
 
         try:
             return int(ch)
@@ -87,15 +109,9 @@ class Guide(stbt.FrameObject):
         Returns:
             string: parental rate
         """
-        for parental in parental_list:
-            if stbt.match(
-                parental,
-                frame=self._frame,
-                region=stbt.Region(1080, 530, width=190, height=180),
-            ):
-                return re.findall(r"\d{1,2}|TP", parental)[0]
+        region = stbt.Region(1080, 530, width=190, height=180)
 
-        return None
+        return self._classify(PARENTAL, region=region).label
 
     @property
     def hd(self):
@@ -105,9 +121,8 @@ class Guide(stbt.FrameObject):
             boolean: True if HD
         """
         return (
-            stbt.match(
+            self._match(
                 Img.HD_ICON,
-                frame=self._frame,
                 region=stbt.Region(1080, 530, width=190, height=180),
             )
         ).match
@@ -120,9 +135,8 @@ class Guide(stbt.FrameObject):
             boolean: True if DOLBY
         """
         return (
-            stbt.match(
+            self._match(
                 Img.DOLBY_ICON,
-                frame=self._frame,
                 region=stbt.Region(1080, 530, width=190, height=180),
             )
         ).match
@@ -135,8 +149,7 @@ class Guide(stbt.FrameObject):
             str: Title of current event
         """
 
-        title = stbt.ocr(
-            frame=self._frame,
+        title = self._ocr(
             lang="spa",
             region=stbt.Region(340, 540, width=925, height=60),
         )
@@ -151,15 +164,14 @@ class Guide(stbt.FrameObject):
             str: Event start time
         """
 
-        start_time = stbt.ocr(
+        start_time = self._ocr(
             region=stbt.Region(345, 605, width=60, height=25),
             text_color_threshold=20,
             mode=stbt.OcrMode.SPARSE_TEXT_WITH_OSD,
         )
 
-        if stbt.match(
+        if self._match(
             Img.PROGRESS_BAR,
-            frame=self._frame,
             region=stbt.Region(405, 595, width=25, height=45),
         ):
 
@@ -170,7 +182,7 @@ class Guide(stbt.FrameObject):
             # Past or Future events
             end_time_region = stbt.Region(420, 605, width=60, height=25)
 
-        end_time = stbt.ocr(
+        end_time = self._ocr(
             region=end_time_region,
             text_color_threshold=20,
             mode=stbt.OcrMode.SPARSE_TEXT_WITH_OSD,
@@ -211,11 +223,7 @@ def assert_screen():
     Returns:
         [obj]: [Returns instance of page]
     """
-    if is_visible():
-        page = Guide()
-        return page
-    else:
-        raise NotInScreen(__name__)
+    return assert_visible(Guide, __name__)
 
 
 def get_parental():
@@ -274,6 +282,27 @@ def get_exihbition_times():
     return page.exihbition_times
 
 
+def get_event_metadata():
+    """Returns metadata of the focused event from a single capture
+    Properties are evaluated concurrently over the same frame
+
+    Returns:
+        namedtuple: fields from EVENT_METADATA
+    """
+    page = assert_screen()
+    metadata = page.snapshot(*EVENT_METADATA)
+
+    stbt.draw_text(
+        "Event: {}".format(
+            (metadata.event_title or "").encode("ascii", "ignore").decode("ascii")
+        )
+    )
+    stbt.draw_text("Channel Number: {}".format(metadata.channel_number))
+    stbt.draw_text("Parental: {}".format(metadata.parental))
+
+    return metadata
+
+
 def get_time_and_date():
     """Returns date and time Ajustes and sub-menu screens
 
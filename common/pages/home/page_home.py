@@ -1,8 +1,13 @@
-import time
 import logging
 
 import stbt
+from common.pages.ajustes import page_ajustes
 from common.utils.rcu import RCU
+from common.utils import templates
+from common.utils.carousel import Carousel
+from common.utils.page_object import PageObject, assert_visible
+from common.utils.settle import wait_for_settle
+from common.utils.template_set import TemplateSet
 from common.exceptions import NotInScreen
 
 logger = logging.getLogger(__file__)
@@ -11,11 +16,13 @@ logger = logging.getLogger(__file__)
 class Img:
     """List of reference images locators"""
 
-    LOGO = "./images/movistar_logo_transparent.png"
-    DOTS = "./images/dots.png"
+    LOGO = "./images/home_movistar_logo_transparent.png"
+    DOTS = "./images/home_dots.png"
 
 
 # Images for menu were cropped in Region(20, 372, width=243, height=57)
+# Items are in the on-screen order, the one reached pressing RIGHT, as seen
+# in the reference frames (images/ref). After APPS the menu wraps to SEARCH
 MENU = {
     "SEARCH": "./images/home_busqueda.png",
     "GUIA": "./images/home_guia.png",
@@ -36,8 +43,13 @@ MENU = {
     "APPS": "./images/home_apps.png",
 }
 
+MENU_ITEMS = TemplateSet(sorted(MENU.items()), __file__)
 
-class Home(stbt.FrameObject):
+# Region with the focused menu item
+MENU_REGION = stbt.Region(10, 350, width=270, height=90)
+
+
+class Home(PageObject):
     """Page Object for Home
 
     When instantiated, an image capture is done and
@@ -60,20 +72,32 @@ class Home(stbt.FrameObject):
         logo_img = Img.LOGO
         dots_img = Img.DOTS
 
-        logo = stbt.match(
+        logo = self._match(
             logo_img,
-            frame=self._frame,
             region=stbt.Region(58, 25, width=120, height=70),
         )
 
-        dots = stbt.match(
+        dots = self._match(
             dots_img,
-            frame=self._frame,
             region=stbt.Region(0, 478, width=158, height=138),
         )
 
         return logo and dots
 
+    @property
+    def focused_menu(self):
+        """Returns focused item from MENU dictionary
+
+        Returns:
+            str: key from MENU dictionary. None if not found
+        """
+        return self._classify(MENU_ITEMS, region=MENU_REGION).label
+
+
+# select() reads the focused item after each burst, so a wrong order is
+# not trusted: access_menu falls back to searching the item with LEFT
+MENU_CAROUSEL = Carousel(list(MENU), lambda: Home().focused_menu, wraps=True)
+
 
 def is_visible():
     """Check if in Home
@@ -91,11 +115,7 @@ def assert_screen():
     Returns:
         [obj]: [Returns instance of page]
     """
-    if is_visible():
-        page = Home()
-        return page
-    else:
-        raise NotInScreen(__name__)
+    return assert_visible(Home, __name__)
 
 
 def go_to_home():
@@ -116,6 +136,8 @@ def go_to_home():
 
 def access_menu(item):
     """Access Home item from the ones defined in MENU dictionary
+    Moves in the shorter direction from the focused item. If the focused
+    item is not identified, goes LEFT until the item is found
 
     Args:
         item ([string]): [key from MENU dictionary]
@@ -124,13 +146,16 @@ def access_menu(item):
 
     try:
         stbt.draw_text("Navigating to {}".format(item))
-        stbt.press_until_match(
-            RCU.LEFT,
-            MENU[item],
-            interval_secs=0.8,
-            max_presses=len(MENU),
-            region=stbt.Region(10, 350, width=270, height=90),
-        )
+        if not MENU_CAROUSEL.select(item):
+            stbt.press_until_match(
+                RCU.LEFT,
+                templates.load(MENU[item], __file__),
+                interval_secs=0.8,
+                max_presses=len(MENU),
+                region=MENU_REGION,
+            )
+            # The focus animation ends before OK is pressed
+            wait_for_settle(MENU_REGION)
     except Exception:
         logger.error(
             "Item not found: '{}'\nCheck valid values in MENU dictionary in {}".format(
@@ -138,5 +163,7 @@ def access_menu(item):
             )
         )
     else:
-        time.sleep(1)
         stbt.press_and_wait(RCU.OK)
+
+        if item == "AJUSTES":
+            page_ajustes.forget_focus()
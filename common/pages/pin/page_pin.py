@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import stbt
+from common.utils import templates
 from common.utils.navigation_utils import send_num_rcu_keys
-from common.exceptions import NotInScreen
+from common.utils.page_object import PageObject, assert_visible
 
 
 class Img:
@@ -16,7 +17,7 @@ class Img:
 DEFAULT_PIN = 1111
 
 
-class Pin(stbt.FrameObject):
+class Pin(PageObject):
     """Page Object for Pin
 
     When instantiated, an image capture is done and
@@ -39,9 +40,9 @@ class Pin(stbt.FrameObject):
 
         region = stbt.Region(475, 335, width=315, height=80)
 
-        box_1 = stbt.match(Img.PIN_FOCUS, frame=self._frame, region=region)
+        box_1 = self._match(Img.PIN_FOCUS, region=region)
 
-        box_2 = stbt.match(Img.PIN_NOT_FOCUS, frame=self._frame, region=region)
+        box_2 = self._match(Img.PIN_NOT_FOCUS, region=region)
 
         return box_1 and box_2
 
@@ -62,11 +63,7 @@ def assert_screen():
     Returns:
         [obj]: [Returns instance of page]
     """
-    if is_visible():
-        page = Pin()
-        return page
-    else:
-        raise NotInScreen(__name__)
+    return assert_visible(Pin, __name__)
 
 
 def insert_pin(digit_list=DEFAULT_PIN):
@@ -91,11 +88,14 @@ def insert_pin(digit_list=DEFAULT_PIN):
         send_num_rcu_keys(digit_list)
 
         region = stbt.Region(440, 315, width=390, height=155)
+        focus = templates.load(Img.PIN_FOCUS, __file__)
+        not_focus = templates.load(Img.PIN_NOT_FOCUS, __file__)
+        incorrect = templates.load(Img.PIN_INCORRECT_TEXT, __file__)
 
         assert stbt.wait_until(
-            lambda: not stbt.match(Img.PIN_FOCUS, region=region)
-            and not stbt.match(Img.PIN_NOT_FOCUS, region=region)
-            or stbt.match(Img.PIN_INCORRECT_TEXT, region=region),
+            lambda: not stbt.match(focus, region=region)
+            and not stbt.match(not_focus, region=region)
+            or stbt.match(incorrect, region=region),
             timeout_secs=3,
         )
 
@@ -107,15 +107,16 @@ def is_pin_incorrect():
     Returns:
         [boolean]: [True if pin is incorrect]
     """
+    page = Pin()
     txt_region = stbt.Region(530, 425, width=225, height=40)
-    pin_incorrect_text = stbt.ocr(
+    pin_incorrect_text = page._ocr(
         region=txt_region,
         text_color_threshold=80,
         mode=stbt.OcrMode.SPARSE_TEXT_WITH_OSD,
         lang="spa",
     )
 
-    if is_visible() and pin_incorrect_text == "PIN INCORRECTO":
+    if page.is_visible and pin_incorrect_text == "PIN INCORRECTO":
         stbt.draw_text("PIN INCORRECTO")
         return True
     else:
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import stbt
+
+from device_access.device_access import MemoryMonitor
+
+logger = logging.getLogger(__file__)
+
+# Threads for blocking calls. Each observer in a thread takes one
+WORKERS = 6
+
+# Time an observer has to start before the observed block runs anyway
+START_TIMEOUT_SECS = 10
+
+# Time a thread call stopped by an observer has to return
+JOIN_TIMEOUT_SECS = 5
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKERS)
+
+    return _executor
+
+
+def run(main, *args, **kwargs):
+    """Runs coroutine function main in a new event loop
+
+    Blocking stbt calls and page helpers are awaited through to_thread(),
+    so the loop keeps serving the observers (memory sampling, packet
+    capture, motion analysis) while the test waits for the screen. Tasks
+    left running when main returns are cancelled before the loop is closed.
+
+    Example:
+        async def main():
+            async with observe(MemorySampler(), MotionObserver()) as observers:
+                await to_thread(page_atleti.wait_end_of_video)
+            print(observers.results["MemorySampler"])
+
+        run(main)
+
+    Args:
+        main (coroutine function): test body
+        timeout_secs (float, optional): cancels main after this time.
+        Defaults to None.
+
+    Returns:
+        obj: value returned by main
+    """
+    timeout_secs = kwargs.pop("timeout_secs", None)
+    loop = asyncio.new_event_loop()
+
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(
+            asyncio.wait_for(main(*args, **kwargs), timeout_secs)
+        )
+    finally:
+        pending = [task for task in _all_tasks(loop) if not task.done()]
+        for task in pending:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+async def to_thread(func, *args, **kwargs):
+    """Runs blocking func in a worker thread and awaits its result
+
+    Cancelling the await does not stop func: it keeps running in its
+    thread until it returns. Long calls that must end with the await need
+    their own stop condition (see MotionObserver).
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        _get_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+async def press(key):
+    """Awaitable stbt.press"""
+    return await to_thread(stbt.press, key)
+
+
+async def wait_for_match(image, **kwargs):
+    """Awaitable stbt.wait_for_match. Raises stbt.MatchTimeout"""
+    return await to_thread(stbt.wait_for_match, image, **kwargs)
+
+
+async def wait_until(condition, timeout_secs=10, interval_secs=0.1):
+    """Awaits until condition returns a truthy value
+
+    Each evaluation of condition runs in a worker thread, and the loop is
+    free between evaluations.
+
+    Returns:
+        obj: last value returned by condition, falsy on timeout
+    """
+    deadline = time.time() + timeout_secs
+
+    while True:
+        result = await to_thread(condition)
+        if result or time.time() >= deadline:
+            return result
+        await asyncio.sleep(interval_secs)
+
+
+class Observer:
+    """Task that runs next to the test until it is cancelled
+
+    Subclasses implement run(), call self.set_started() once they are
+    observing and leave their data in self.result. The observed block does
+    not start until every observer is started.
+    """
+
+    def __init__(self, name=None):
+        self.name = name or type(self).__name__
+        self.result = None
+        self.started = None
+
+    async def run(self):
+        raise NotImplementedError
+
+    def set_started(self):
+        """Tells the ObserverGroup that the observer is running"""
+        if self.started is not None:
+            self.started.set()
+
+
+class MemorySampler(Observer):
+    """Samples decoder memory through MemoryMonitor every interval_secs
+
+    result: list of (time, memory data)
+    """
+
+    def __init__(self, interval_secs=5, name=None):
+        super(MemorySampler, self).__init__(name)
+        self.interval_secs = interval_secs
+        self.result = []
+
+    async def run(self):
+        if not await to_thread(MemoryMonitor.start_memory_monitor):
+            logger.error("Memory monitor not started")
+            return
+
+        self.set_started()
+
+        while True:
+            data = await to_thread(MemoryMonitor.get_memory_data)
+            self.result.append((time.time(), data))
+            await asyncio.sleep(self.interval_secs)
+
+
+class PacketCapture(Observer):
+    """Runs a capture of NetworkCaptureHandler while observing
+
+    result: data returned by the stop method of the capture
+    """
+
+    def __init__(self, handler, capture="live", name=None):
+        """__init__
+
+        Args:
+            handler (NetworkCaptureHandler): handler from network_module()
+            capture (str, optional): "live" or "vod". Defaults to "live".
+        """
+        super(PacketCapture, self).__init__(name)
+        self.handler = handler
+        self.capture = capture
+
+    async def run(self):
+        start = getattr(self.handler, "start_{}_capture".format(self.capture))
+        stop = getattr(self.handler, "stop_{}_capture".format(self.capture))
+
+        await to_thread(start)
+        self.set_started()
+
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self.result = await to_thread(stop)
+
+
+class MotionObserver(Observer):
+    """Records motion detection results in a worker thread
+
+    result: list of (time, motion)
+    """
+
+    def __init__(self, mask=None, region=stbt.Region.ALL, name=None):
+        super(MotionObserver, self).__init__(name)
+        self.mask = mask
+        self.region = region
+        self.result = []
+
+    async def run(self):
+        loop = asyncio.get_event_loop()
+        stop = threading.Event()
+        future = _get_executor().submit(self._detect, stop, loop)
+
+        try:
+            await asyncio.shield(asyncio.wrap_future(future))
+        finally:
+            stop.set()
+            await _join(future, self.name)
+
+    def _detect(self, stop, loop):
+        for motion in stbt.detect_motion(mask=self.mask, region=self.region):
+            if not self.result:
+                loop.call_soon_threadsafe(self.set_started)
+            if stop.is_set():
+                return
+            self.result.append((motion.time, bool(motion.motion)))
+
+
+class ObserverGroup:
+    """Async context manager that runs observers during a block
+
+    Entering the block waits until every observer is started (for example
+    the packet capture is running), up to START_TIMEOUT_SECS. Leaving the
+    block cancels the observers and waits for them to finish. If an
+    observer fails, the block is cancelled and the observer exception is
+    raised from the async with statement.
+    """
+
+    def __init__(self, *observers):
+        self.observers = observers
+        self._tasks = []
+        self._body = None
+        self._failed = None
+
+    @property
+    def results(self):
+        """Returns dict with the result of each observer by name"""
+        return dict((observer.name, observer.result) for observer in self.observers)
+
+    async def __aenter__(self):
+        loop = asyncio.get_event_loop()
+
+        for observer in self.observers:
+            observer.started = asyncio.Event()
+            task = loop.create_task(observer.run())
+            task.add_done_callback(self._on_done)
+            self._tasks.append(task)
+
+        for observer, task in zip(self.observers, self._tasks):
+            await self._wait_started(observer, task)
+
+        if self._failed is not None:
+            await self._stop()
+            raise self._failed
+
+        self._body = _current_task(loop)
+
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._body = None
+        await self._stop()
+
+        if self._failed is not None:
+            raise self._failed
+
+        return False
+
+    async def _stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _wait_started(observer, task):
+        started = asyncio.ensure_future(observer.started.wait())
+        done, _ = await asyncio.wait(
+            [started, task],
+            timeout=START_TIMEOUT_SECS,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        started.cancel()
+
+        if not done:
+            logger.warning(
+                "{} not started in {}s".format(observer.name, START_TIMEOUT_SECS)
+            )
+
+    def _on_done(self, task):
+        if task.cancelled() or task.exception() is None or self._failed:
+            return
+
+        self._failed = task.exception()
+        logger.error("Observer failed: {!r}".format(self._failed))
+
+        if self._body is not None:
+            self._body.cancel()
+
+
+def observe(*observers):
+    """Returns ObserverGroup running observers during an async with block"""
+    return ObserverGroup(*observers)
+
+
+async def _join(future, name):
+    """Waits for a thread call that was asked to stop"""
+    deadline = time.time() + JOIN_TIMEOUT_SECS
+
+    while not future.done():
+        if time.time() >= deadline:
+            logger.warning("{} thread still running".format(name))
+            return
+        await asyncio.sleep(0.05)
+
+
+def _current_task(loop):
+    if hasattr(asyncio, "current_task"):
+        return asyncio.current_task(loop)
+    return asyncio.Task.current_task(loop)
+
+
+def _all_tasks(loop):
+    if hasattr(asyncio, "all_tasks"):
+        return asyncio.all_tasks(loop)
+    return asyncio.Task.all_tasks(loop)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import logging
+import time
+
+import stbt
+
+from common.utils import key_timing
+from common.utils.rcu import RCU
+
+logger = logging.getLogger(__file__)
+
+
+class Carousel:
+    """Row of items moved with two keys, in a known order
+
+    The focused item is read once, the shorter direction to the target is
+    chosen (both ways round if the row wraps) and all the presses are sent
+    in a burst. The focused item is only read again to verify the landing.
+
+    Example:
+        MENU_CAROUSEL = Carousel(MENU_ORDER, lambda: Home().focused_menu, wraps=True)
+        MENU_CAROUSEL.select("AJUSTES")
+    """
+
+    def __init__(
+        self,
+        items,
+        focused,
+        next_key=RCU.RIGHT,
+        previous_key=RCU.LEFT,
+        wraps=False,
+        interval_secs=None,
+    ):
+        """__init__
+
+        Args:
+            items (list): labels in the order reached pressing next_key
+            focused (callable): returns label of the focused item. None if
+            not identified
+            next_key (str, optional): Defaults to RCU.RIGHT.
+            previous_key (str, optional): Defaults to RCU.LEFT.
+            wraps (bool, optional): True if moving past the last item focuses
+            the first one. Defaults to False.
+            interval_secs (float, optional): gap between presses of a burst.
+            Defaults to the key gap of the timing profile of the STB model.
+        """
+        self.items = list(items)
+        self.focused = focused
+        self.next_key = next_key
+        self.previous_key = previous_key
+        self.wraps = wraps
+        self.interval_secs = interval_secs
+
+    def presses(self, current, target):
+        """Returns shorter (key, presses) from current to target"""
+        forward = self.items.index(target) - self.items.index(current)
+
+        if self.wraps:
+            forward %= len(self.items)
+            backward = len(self.items) - forward
+            if backward < forward:
+                return self.previous_key, backward
+
+        if forward < 0:
+            return self.previous_key, -forward
+
+        return self.next_key, forward
+
+    def select(self, target, stable_secs=0.5, attempts=2):
+        """Moves the focus to target
+
+        Args:
+            target (str): label from items
+            stable_secs (float, optional): time the screen must be stable after
+            the last press. Defaults to 0.5.
+            attempts (int, optional): bursts sent before giving up.
+            Defaults to 2.
+
+        Returns:
+            bool: True if target is focused
+        """
+        if target not in self.items:
+            raise ValueError("Unknown carousel item: {}".format(target))
+
+        for attempt in range(attempts + 1):
+            current = self.focused()
+
+            if current == target:
+                return True
+
+            if current is None or attempt == attempts:
+                break
+
+            key, count = self.presses(current, target)
+            logger.info("{} -> {}: {} x {}".format(current, target, key, count))
+
+            if count > 1:
+                interval_secs = self.interval_secs
+                if interval_secs is None:
+                    interval_secs = key_timing.get_profile().key_gap_secs
+
+                for _ in range(count - 1):
+                    stbt.press(key, interpress_delay_secs=interval_secs)
+                time.sleep(interval_secs)
+            stbt.press_and_wait(key, stable_secs=stable_secs)
+
+        logger.error("Could not focus {} (focused: {})".format(target, current))
+        return False
@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import logging
+import os
+import threading
+import weakref
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from common.utils import storage
+from common.utils.frames import crop, to_gray
+
+logger = logging.getLogger(__file__)
+
+DIGITS = "0123456789"
+
+# Size of the normalized glyphs (width, height)
+GLYPH_SIZE = (16, 24)
+
+# Samples kept per character
+MAX_SAMPLES = 4
+
+# Gap between glyphs, relative to the glyph height, read as a space
+SPACE_GAP_RATIO = 0.3
+
+# Minimum number of ink pixels for a column run to be a glyph and not noise
+MIN_GLYPH_PIXELS = 3
+
+# OCR readings of different images that must agree on a glyph before it is
+# learned, or disagree with a learned glyph before it is dropped
+CONFIRMATIONS = 3
+
+Reading = namedtuple("Reading", "text confidence")
+
+_readers = weakref.WeakSet()
+
+
+class DigitReader:
+    """Reads short numbers printed with the fixed font of the STB UI
+
+    The region is binarized and split into glyphs by its column profile.
+    Every glyph is normalized and correlated at once against the known
+    glyph set with a single matrix product, which takes well under a
+    millisecond for a few digits.
+
+    The glyph set is learned: when the confidence is low the reader falls
+    back to OCR, and a reading whose glyph count matches the OCR text makes
+    its glyphs candidates. A candidate is only added to the set when the
+    OCR of CONFIRMATIONS different images agrees on it, and a learned glyph
+    is dropped when as many disagree, so a single misread does not stay in
+    the set. Glyph sets are stored per reader name, so each UI font and
+    size gets its own set, and they persist across runs until reset().
+    """
+
+    def __init__(self, name, charset=DIGITS, threshold=0.85):
+        """__init__
+
+        Args:
+            name (str): glyph set name. Use one per font/size in the UI
+            charset (str, optional): characters that can be learned.
+            Defaults to DIGITS.
+            threshold (float, optional): minimum correlation to trust a
+            reading without OCR. Defaults to 0.85.
+        """
+        self.name = name
+        self.charset = charset
+        self.threshold = threshold
+        self.hits = 0
+        self.fallbacks = 0
+        # (labels, vectors) replaced as a whole, so readers never see a
+        # half updated set. None until loaded
+        self._glyphs = None
+        # [char, vector, digests of the images that agreed]
+        self._candidates = []
+        # index of learned glyph -> digests of the images that disagreed
+        self._disagreements = {}
+        self._lock = threading.Lock()
+        _readers.add(self)
+
+    @property
+    def path(self):
+        return storage.data_path("glyphs_{}.npz".format(self.name))
+
+    def read(self, frame, region, fallback):
+        """Reads text in region, falling back to OCR when not confident
+
+        Args:
+            frame (stbt.Frame): captured frame
+            region (stbt.Region): region with the text
+            fallback (callable): returns OCR text of the same region
+
+        Returns:
+            Reading: text and confidence of the glyph correlation
+        """
+        image = crop(frame, region)
+        reading = self.recognize(image) if image is not None else None
+
+        if reading is not None and reading.confidence >= self.threshold:
+            self.hits += 1
+            return reading
+
+        self.fallbacks += 1
+        text = fallback()
+
+        if text and image is not None:
+            self.learn(image, text.strip())
+
+        return Reading(text, reading.confidence if reading else 0.0)
+
+    def recognize(self, image):
+        """Returns Reading from the known glyphs. None if nothing to compare"""
+        labels, vectors = self._glyph_set()
+
+        glyphs, spaces = _segment(image)
+
+        if not glyphs or vectors is None:
+            return None
+
+        scores = np.dot(np.array(glyphs), vectors.T)
+        best = scores.argmax(axis=1)
+
+        text = ""
+        for i, label in enumerate(best):
+            if i in spaces:
+                text += " "
+            text += labels[label]
+
+        return Reading(text, float(scores.max(axis=1).min()))
+
+    def learn(self, image, text):
+        """Checks the glyphs of image, labelled with text, against the set
+
+        Glyphs are learned once CONFIRMATIONS different images agree on
+        them.
+
+        Args:
+            image (numpy.ndarray): region pixels
+            text (str): text read by OCR
+
+        Returns:
+            bool: True if the reading agrees with the glyph set
+        """
+        chars = [char for char in text if not char.isspace()]
+
+        if not chars or not all(char in self.charset for char in chars):
+            return False
+
+        glyphs, _ = _segment(image)
+
+        if len(glyphs) != len(chars):
+            return False
+
+        digest = hashlib.sha1(image.tobytes()).hexdigest()
+        agrees = True
+
+        with self._lock:
+            labels, vectors = self._load()
+            labels = list(labels)
+            vectors = list(vectors) if vectors is not None else []
+            changed = False
+
+            for char, glyph in zip(chars, glyphs):
+                best = _best(vectors, glyph, self.threshold)
+
+                if best is not None:
+                    if labels[best] != char:
+                        # OCR disagrees with a known glyph
+                        logger.warning(
+                            "{}: OCR read '{}' as '{}'".format(
+                                self.name, labels[best], char
+                            )
+                        )
+                        agrees = False
+                        if self._disagree(best, digest):
+                            del labels[best]
+                            del vectors[best]
+                            changed = True
+                    continue
+
+                if self._confirm(char, glyph, digest):
+                    if labels.count(char) < MAX_SAMPLES:
+                        labels.append(char)
+                        vectors.append(glyph)
+                        changed = True
+
+            if changed:
+                self._glyphs = (tuple(labels), np.array(vectors) if vectors else None)
+                self._disagreements = {}
+                self._save()
+
+        return agrees
+
+    def reset(self):
+        """Forgets the glyph set, in memory and on disk"""
+        with self._lock:
+            self._glyphs = None
+            self._candidates = []
+            self._disagreements = {}
+
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+        logger.info("Glyph set {} reset".format(self.name))
+
+    def _confirm(self, char, glyph, digest):
+        """Counts the reading of a glyph not in the set.
+        Returns True when it has been confirmed CONFIRMATIONS times
+        """
+        candidates = [vector for _, vector, _ in self._candidates]
+        best = _best(candidates, glyph, self.threshold)
+
+        if best is None:
+            self._candidates.append([char, glyph, set([digest])])
+            return CONFIRMATIONS <= 1
+
+        candidate = self._candidates[best]
+
+        if candidate[0] != char:
+            # Readings disagree, none of them is trusted
+            logger.warning(
+                "{}: OCR read '{}' and '{}'".format(self.name, candidate[0], char)
+            )
+            del self._candidates[best]
+            return False
+
+        candidate[2].add(digest)
+
+        if len(candidate[2]) >= CONFIRMATIONS:
+            del self._candidates[best]
+            return True
+
+        return False
+
+    def _disagree(self, index, digest):
+        """Counts an OCR reading against learned glyph index.
+        Returns True when it must be dropped
+        """
+        digests = self._disagreements.setdefault(index, set())
+        digests.add(digest)
+
+        if len(digests) >= CONFIRMATIONS:
+            logger.warning("{}: glyph dropped from the set".format(self.name))
+            return True
+
+        return False
+
+    def _glyph_set(self):
+        """Returns (labels, vectors) of the glyph set, loaded on first use"""
+        glyphs = self._glyphs
+
+        if glyphs is None:
+            with self._lock:
+                glyphs = self._load()
+
+        return glyphs
+
+    def _load(self):
+        """Returns (labels, vectors), reading the stored set if not loaded.
+        Called with the lock held
+        """
+        if self._glyphs is not None:
+            return self._glyphs
+
+        glyphs = ((), None)
+
+        if os.path.isfile(self.path):
+            try:
+                data = np.load(self.path)
+                labels = tuple(str(label) for label in data["labels"])
+                glyphs = (labels, data["vectors"])
+            except (IOError, KeyError, ValueError) as e:
+                logger.error("Glyph set {} not loaded: {}".format(self.name, e))
+
+        self._glyphs = glyphs
+
+        return glyphs
+
+    def _save(self):
+        labels, vectors = self._glyphs
+
+        if vectors is None:
+            if os.path.isfile(self.path):
+                os.remove(self.path)
+            return
+
+        try:
+            np.savez(self.path, labels=np.array(labels), vectors=vectors)
+        except IOError as e:
+            logger.error("Glyph set {} not saved: {}".format(self.name, e))
+
+
+def reset_all():
+    """Resets the glyph sets of all the readers"""
+    for reader in list(_readers):
+        reader.reset()
+
+
+def _best(vectors, glyph, threshold):
+    """Returns index of the vector most correlated with glyph. None if no
+    correlation reaches threshold
+    """
+    if not len(vectors):
+        return None
+
+    scores = np.dot(np.array(vectors), glyph)
+    best = scores.argmax()
+
+    return best if scores[best] >= threshold else None
+
+
+def _segment(image):
+    """Splits image in normalized glyph vectors using its column profile
+
+    Args:
+        image (numpy.ndarray): region pixels
+
+    Returns:
+        tuple: (list of glyph vectors, set of glyph indexes preceded by a space)
+    """
+    gray = to_gray(image)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    # Text is the minority class, whatever its color
+    if np.count_nonzero(binary) > binary.size / 2:
+        binary = 255 - binary
+
+    ink = binary > 0
+    columns = np.concatenate(([False], ink.any(axis=0), [False]))
+    edges = np.flatnonzero(np.diff(columns.astype(np.int8)))
+
+    boxes = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        glyph = ink[:, start:end]
+        if np.count_nonzero(glyph) < MIN_GLYPH_PIXELS:
+            continue
+        rows = np.flatnonzero(glyph.any(axis=1))
+        top, bottom = rows[0], rows[-1] + 1
+        boxes.append((start, end, glyph[top:bottom]))
+
+    if not boxes:
+        return [], set()
+
+    height = np.median([glyph.shape[0] for _, _, glyph in boxes])
+    spaces = set(
+        i
+        for i in range(1, len(boxes))
+        if boxes[i][0] - boxes[i - 1][1] > SPACE_GAP_RATIO * height
+    )
+
+    return [_normalize(glyph) for _, _, glyph in boxes], spaces
+
+
+def _normalize(glyph):
+    """Returns zero mean, unit norm vector of glyph resized to GLYPH_SIZE
+
+    The aspect ratio is kept, so narrow glyphs like "1" stay narrow.
+    """
+    width, height = GLYPH_SIZE
+    glyph = glyph.astype(np.float32)
+    scale = float(height) / glyph.shape[0]
+    scaled_width = max(1, min(width, int(round(glyph.shape[1] * scale))))
+    glyph = cv2.resize(glyph, (scaled_width, height), interpolation=cv2.INTER_AREA)
+
+    canvas = np.zeros((height, width), dtype=np.float32)
+    left = (width - scaled_width) // 2
+    right = left + scaled_width
+    canvas[:, left:right] = glyph
+
+    vector = canvas.ravel()
+    vector -= vector.mean()
+    norm = np.linalg.norm(vector)
+
+    return vector / norm if norm else vector
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+
+import cv2
+import numpy as np
+
+from common.utils.frames import crop, to_gray
+
+logger = logging.getLogger(__file__)
+
+# Difference of a pixel, in gray levels, that is not considered noise
+NOISE_THRESHOLD = 25
+
+# Changed columns closer than this are joined in the same run
+COLUMN_GAP = 8
+
+# Runs narrower than this are noise, not a focus highlight
+MIN_RUN_WIDTH = 12
+
+# Above this fraction of changed columns the screen changed, not the focus
+MAX_CHANGED_FRACTION = 0.6
+
+# Columns added around a focus run when searching the known crops in it
+SEARCH_MARGIN = 16
+
+# Minimum correlation for a crop to be the same pill
+SIMILARITY = 0.98
+
+
+class FocusTracker:
+    """Follows the focus highlight along a horizontal row of pills
+
+    The first frame is identified with locate(), which is slow (template
+    matching or OCR). On the next frames only the strip is differenced
+    against the previous one: the changed run of columns away from the
+    previous focus is the new focus. Its crop is compared with the crops of
+    the pills already identified, so locate() is only called again for
+    pills never seen or when the whole strip changed.
+    """
+
+    def __init__(self, strip, locate):
+        """__init__
+
+        Args:
+            strip (stbt.Region): region with the row of pills
+            locate (callable): locate(frame) returns (label, stbt.Region) of
+            the focused pill, or (None, None)
+        """
+        self.strip = strip
+        self.locate = locate
+        self.hits = 0
+        self.misses = 0
+        self._labels = []
+        self._crops = []
+        self._last = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forgets the last focus. The next call locates it again"""
+        with self._lock:
+            self._last = None
+
+    def focused(self, frame):
+        """Returns label of the focused pill in frame. None if no focus"""
+        with self._lock:
+            strip = crop(frame, self.strip)
+            if strip is None:
+                return None
+            strip = to_gray(strip)
+
+            if self._last is not None:
+                last_strip, last_span, last_label = self._last
+
+                span = self._moved_focus(last_strip, strip, last_span)
+
+                if span is last_span:
+                    self._last = (strip, span, last_label)
+                    return last_label
+
+                if span is not None:
+                    label = self._lookup(strip, span)
+                    if label is not None:
+                        self.hits += 1
+                        self._last = (strip, span, label)
+                        return label
+
+            self.misses += 1
+            label, region = self.locate(frame)
+
+            if label is None or region is None:
+                self._last = None
+                return label
+
+            width = strip.shape[1]
+            span = (
+                max(0, region.x - self.strip.x),
+                min(width, region.right - self.strip.x),
+            )
+            self._remember(strip, span, label)
+            self._last = (strip, span, label)
+
+            return label
+
+    def _moved_focus(self, previous, current, last_span):
+        """Returns span (first, last column) of the new focus in the strip
+
+        Returns last_span if the strip did not change and None if the new
+        focus can not be told apart
+        """
+        if previous.shape != current.shape:
+            return None
+
+        difference = cv2.absdiff(previous, current) > NOISE_THRESHOLD
+        columns = difference.any(axis=0)
+
+        if not columns.any():
+            return last_span
+
+        if np.count_nonzero(columns) > MAX_CHANGED_FRACTION * columns.size:
+            return None
+
+        # The previous focus also changed, keep what is outside of it
+        last_start, last_end = last_span
+        runs = []
+        for start, end in _runs(columns):
+            for piece in ((start, min(end, last_start)), (max(start, last_end), end)):
+                if piece[1] - piece[0] >= MIN_RUN_WIDTH:
+                    runs.append(piece)
+
+        if len(runs) != 1:
+            return None
+
+        return runs[0]
+
+    def _lookup(self, strip, span):
+        """Returns label of the known crop that best matches around span.
+        None if none is similar enough
+        """
+        start, end = span
+        start = max(0, start - SEARCH_MARGIN)
+        end = min(strip.shape[1], end + SEARCH_MARGIN)
+        window = strip[:, start:end]
+
+        best_label, best_score = None, SIMILARITY
+
+        for label, known in zip(self._labels, self._crops):
+            if known.shape[1] > window.shape[1]:
+                continue
+
+            scores = cv2.matchTemplate(window, known, cv2.TM_CCOEFF_NORMED)
+            score = scores.max()
+
+            if score >= best_score:
+                best_label, best_score = label, score
+
+        return best_label
+
+    def _remember(self, strip, span, label):
+        start, end = span
+
+        if end - start < MIN_RUN_WIDTH or self._lookup(strip, span) == label:
+            return
+
+        self._labels.append(label)
+        self._crops.append(strip[:, start:end].copy())
+        logger.info("Pill crop learned: {}".format(label))
+
+
+def _runs(columns):
+    """Returns (start, end) of the runs of True values, joining gaps
+    narrower than COLUMN_GAP
+    """
+    padded = np.concatenate(([0], columns.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    runs = []
+
+    for start, end in zip(edges[::2], edges[1::2]):
+        if runs and start - runs[-1][1] < COLUMN_GAP:
+            runs[-1] = (runs[-1][0], end)
+        else:
+            runs.append((start, end))
+
+    return runs
+
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import cv2
+import stbt
+
+
+def frame_region(frame):
+    """Returns Region covering the whole frame"""
+    height, width = frame.shape[:2]
+    return stbt.Region(0, 0, width=width, height=height)
+
+
+def crop(frame, region=stbt.Region.ALL):
+    """Returns the pixels of frame inside region
+
+    Args:
+        frame (stbt.Frame): captured frame
+        region (stbt.Region, optional): Defaults to stbt.Region.ALL.
+
+    Returns:
+        numpy.ndarray: view of the frame clamped to its bounds. None if the
+        region is outside the frame
+    """
+    region = stbt.Region.intersect(region, frame_region(frame))
+
+    if region is None:
+        return None
+
+    x, y, right, bottom = region.x, region.y, region.right, region.bottom
+
+    return frame[y:bottom, x:right]
+
+
+def to_gray(image):
+    """Returns single channel version of a BGR/BGRA image"""
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+_captures = 0
+_captures_lock = threading.Lock()
+
+
+def get_frame():
+    """Returns stbt.get_frame() and counts the capture
+
+    Page objects grab their frame through this function, so the number of
+    frames captured per test step can be checked with captures().
+    """
+    global _captures
+
+    with _captures_lock:
+        _captures += 1
+
+    return stbt.get_frame()
+
+
+def captures():
+    """Returns number of frames captured through get_frame()"""
+    return _captures
+
+
+def reset_captures():
+    """Resets the counter of captured frames"""
+    global _captures
+
+    with _captures_lock:
+        _captures = 0
@@ -7,6 +7,8 @@ import logging
 
 import stbt
 
+from common.utils.digit_reader import DIGITS, DigitReader
+
 logger = logging.getLogger(__file__)
 
 
@@ -25,6 +27,10 @@ class MONTH(Enum):
     dic = 12
 
 
+# Clock is read as "9 feb 12:52", so month names are learned as well
+CLOCK = DigitReader("clock", charset=DIGITS + ":" + "".join(MONTH.__members__))
+
+
 class GetTimeAndDate:
     """
     Class that returns date and time from Ajustes and sub-menu screens
@@ -49,11 +55,12 @@ class GetTimeAndDate:
     @property
     def _time_and_date_raw(self):
         region = self.region
-        __time_and_date_raw = stbt.ocr(
-            region=region,
+        __time_and_date_raw = self.obj._read_digits(
+            CLOCK,
+            region,
             text_color_threshold=20,
             mode=stbt.OcrMode.SPARSE_TEXT_WITH_OSD,
-        )
+        ).text
 
         return __time_and_date_raw
 
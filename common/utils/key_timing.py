@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import threading
+from collections import namedtuple
+
+from common.utils import storage
+from device_access.device_access import DeviceInformation
+
+logger = logging.getLogger(__file__)
+
+# key_gap_secs: minimum gap between keys for the STB to take all of them
+# commit_secs: time the STB waits after the last digit before zapping
+TimingProfile = namedtuple("TimingProfile", "key_gap_secs commit_secs")
+
+# Used for models that were never calibrated
+DEFAULT_PROFILE = TimingProfile(key_gap_secs=0.5, commit_secs=5.0)
+
+# Measured values are multiplied by the margin before being stored
+SAFETY_MARGIN = 1.2
+
+# Range of key gaps searched by calibrate() and number of halvings
+GAP_RANGE = (0.05, 1.0)
+GAP_ITERATIONS = 5
+
+_profiles = {}
+_model = None
+_lock = threading.Lock()
+
+
+def profiles_path():
+    return storage.data_path("key_timing.json")
+
+
+def device_model():
+    """Returns STB model name used as profile key, read once per process"""
+    global _model
+
+    if _model is None:
+        _model = DeviceInformation.get_device_info()["STB_MODEL_NAME"]
+
+    return _model
+
+
+def get_profile(model=None):
+    """Returns timing profile of the STB model
+
+    Args:
+        model (str, optional): STB model. Defaults to the connected device.
+
+    Returns:
+        TimingProfile: calibrated profile, or DEFAULT_PROFILE
+    """
+    model = model or device_model()
+
+    with _lock:
+        if model not in _profiles:
+            stored = _load().get(model)
+            _profiles[model] = (
+                TimingProfile(**stored) if stored else DEFAULT_PROFILE
+            )
+
+        return _profiles[model]
+
+
+def save_profile(profile, model=None):
+    """Stores timing profile of the STB model
+
+    Args:
+        profile (TimingProfile): timings
+        model (str, optional): STB model. Defaults to the connected device.
+    """
+    model = model or device_model()
+
+    with _lock:
+        stored = _load()
+        stored[model] = profile._asdict()
+
+        with open(profiles_path(), "w") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+
+        _profiles[model] = profile
+
+    logger.info("Timing profile for {}: {}".format(model, profile))
+
+
+def calibrate(trial, model=None):
+    """Measures the timing profile of the STB model and stores it
+
+    The key gap is found with a binary search in GAP_RANGE: a gap is valid
+    when trial(gap) succeeds. The commit time is the slowest commit of the
+    successful trials. Both get SAFETY_MARGIN.
+
+    Args:
+        trial (callable): sends a numeric entry with the given key gap and
+        returns the seconds from the last key until the zap happened, or None
+        if the STB did not take the entry
+        model (str, optional): STB model. Defaults to the connected device.
+
+    Returns:
+        TimingProfile: calibrated profile
+    """
+    low, high = GAP_RANGE
+    commits = []
+
+    commit = trial(high)
+    if commit is None:
+        raise RuntimeError("Numeric entry failed with {}s key gap".format(high))
+    commits.append(commit)
+
+    for _ in range(GAP_ITERATIONS):
+        gap = (low + high) / 2
+        commit = trial(gap)
+        logger.info("Key gap {:.3f}s: {}".format(gap, commit))
+
+        if commit is None:
+            low = gap
+        else:
+            high = gap
+            commits.append(commit)
+
+    profile = TimingProfile(
+        key_gap_secs=round(high * SAFETY_MARGIN, 3),
+        commit_secs=round(max(commits) * SAFETY_MARGIN, 3),
+    )
+    save_profile(profile, model)
+
+    return profile
+
+
+def _load():
+    try:
+        with open(profiles_path(), "r") as f:
+            return json.load(f)
+    except IOError:
+        return {}
+    except ValueError as e:
+        logger.error("Timing profiles not loaded: {}".format(e))
+        return {}
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+import atexit
+import logging
+import math
+import sqlite3
+import threading
+import time
+import uuid
+
+from common.utils import storage
+from device_access.device_access import DeviceInformation
+
+logger = logging.getLogger(__file__)
+
+# Measurements kept in memory before they are written in one transaction
+BATCH_SIZE = 50
+
+# Percentiles of summary()
+SUMMARY_PERCENTILES = (50, 90, 95)
+
+COLUMNS = (
+    "run_id",
+    "test_id",
+    "name",
+    "iteration",
+    "model",
+    "version",
+    "value",
+    "time",
+)
+
+
+class KpiStore:
+    """Append-only store of KPI measurements in a SQLite file
+
+    Every measurement is one row with the test, the run, the iteration,
+    the device model and version and the time it was taken, so the results
+    of all the runs are kept. Rows are buffered and written in batches.
+    Values are indexed by (test_id, name, value), so percentiles are read
+    from the index without sorting the measurements.
+    """
+
+    def __init__(self, path=None, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = []
+        self._db = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self):
+        if self._db is None:
+            path = self.path or storage.data_path("kpi.sqlite")
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS kpi "
+                "(id INTEGER PRIMARY KEY, run_id TEXT, test_id TEXT, name TEXT, "
+                "iteration INTEGER, model TEXT, version TEXT, value REAL, time REAL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS kpi_value ON kpi (test_id, name, value)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS kpi_run ON kpi (run_id)")
+            self._db.commit()
+
+        return self._db
+
+    def start_run(self, test_id, device_info=None):
+        """Returns KpiRun that records the measurements of one execution
+
+        Args:
+            test_id (str): test case id, like "TC-6"
+            device_info (dict, optional): Defaults to
+            DeviceInformation.get_device_info()
+        """
+        return KpiRun(self, test_id, device_info or DeviceInformation.get_device_info())
+
+    def add(self, row):
+        """Buffers row (values of COLUMNS). Writes the batch when it is full"""
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size:
+                self._write()
+
+    def flush(self):
+        """Writes the buffered measurements"""
+        with self._lock:
+            self._write()
+
+    def values(self, test_id, name, run_id=None):
+        """Returns values of a KPI in the order they were recorded"""
+        query, params = self._where(test_id, name, run_id=run_id)
+        self.flush()
+
+        return [
+            value
+            for (value,) in self.db.execute(
+                "SELECT value FROM kpi WHERE " + query + " ORDER BY id", params
+            )
+        ]
+
+    def percentile(self, test_id, name, percent, model=None):
+        """Returns nearest rank percentile of a KPI across all the runs
+
+        Args:
+            test_id (str): test case id
+            name (str): KPI name
+            percent (float): 0 to 100
+            model (str, optional): only measurements of this STB model.
+            Defaults to None, all.
+
+        Returns:
+            float: None if there are no measurements
+        """
+        query, params = self._where(test_id, name, model=model)
+        self.flush()
+
+        count = self.db.execute(
+            "SELECT COUNT(*) FROM kpi WHERE " + query, params
+        ).fetchone()[0]
+
+        if count == 0:
+            return None
+
+        rank = min(count, max(1, int(math.ceil(percent / 100.0 * count))))
+        row = self.db.execute(
+            "SELECT value FROM kpi WHERE " + query + " ORDER BY value LIMIT 1 OFFSET ?",
+            params + (rank - 1,),
+        ).fetchone()
+
+        return row[0]
+
+    def summary(self, test_id, name, model=None):
+        """Returns dict with runs, count, min, max, avg and the
+        SUMMARY_PERCENTILES (p50, p90...) of a KPI across all the runs
+        """
+        query, params = self._where(test_id, name, model=model)
+        self.flush()
+
+        runs, count, minimum, maximum, average = self.db.execute(
+            "SELECT COUNT(DISTINCT run_id), COUNT(*), MIN(value), MAX(value), "
+            "AVG(value) FROM kpi WHERE " + query,
+            params,
+        ).fetchone()
+
+        result = {
+            "runs": runs,
+            "count": count,
+            "min": minimum,
+            "max": maximum,
+            "avg": average,
+        }
+        for percent in SUMMARY_PERCENTILES:
+            result["p{}".format(percent)] = self.percentile(
+                test_id, name, percent, model
+            )
+
+        return result
+
+    def _write(self):
+        if not self._pending:
+            return
+
+        try:
+            with self.db:
+                self.db.executemany(
+                    "INSERT INTO kpi ({}) VALUES ({})".format(
+                        ", ".join(COLUMNS), ", ".join("?" for _ in COLUMNS)
+                    ),
+                    self._pending,
+                )
+        except sqlite3.Error as e:
+            logger.error("KPI store not available: {}".format(e))
+            return
+
+        logger.info("{} KPI measurements stored".format(len(self._pending)))
+        self._pending = []
+
+    @staticmethod
+    def _where(test_id, name, model=None, run_id=None):
+        query = "test_id = ? AND name = ?"
+        params = (test_id, name)
+
+        if model is not None:
+            query += " AND model = ?"
+            params += (model,)
+        if run_id is not None:
+            query += " AND run_id = ?"
+            params += (run_id,)
+
+        return query, params
+
+
+class KpiRun:
+    """Measurements of one execution of a test
+
+    Example:
+        with kpi_store.start_run("TC-6") as run:
+            run.record("app_access_time", 3.2)
+    """
+
+    def __init__(self, store, test_id, device_info):
+        self.store = store
+        self.test_id = test_id
+        self.model = device_info.get("STB_MODEL_NAME")
+        self.version = device_info.get("VERSION")
+        self.run_id = uuid.uuid4().hex
+        self._iterations = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def record(self, name, value, iteration=None):
+        """Adds measurement of KPI name
+
+        Args:
+            name (str): KPI name, like "app_access_time"
+            value (float): measured value
+            iteration (int, optional): Defaults to the next one of name.
+        """
+        if iteration is None:
+            iteration = self._iterations.get(name, 0)
+        self._iterations[name] = iteration + 1
+
+        self.store.add(
+            (
+                self.run_id,
+                self.test_id,
+                name,
+                iteration,
+                self.model,
+                self.version,
+                value,
+                time.time(),
+            )
+        )
+
+    def values(self, name):
+        """Returns values of KPI name recorded in this run"""
+        return self.store.values(self.test_id, name, run_id=self.run_id)
+
+    def close(self):
+        """Writes the measurements still buffered"""
+        self.store.flush()
+
+
+store = KpiStore()
+
+# Buffered measurements are not lost if the test ends without close()
+atexit.register(store.flush)
+
+
+def start_run(test_id):
+    """Returns KpiRun of the shared store for test_id"""
+    return store.start_run(test_id)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import logging
+import time
+from collections import namedtuple
+
+import stbt
+
+logger = logging.getLogger(__file__)
+
+# secs: from the key press to the capture of the first matching frame
+# uncertainty_secs: capture interval between the last frame checked
+# without match and the first matching one. The screen changed inside it
+# press_secs: time stbt.press took to send the key
+KpiTiming = namedtuple(
+    "KpiTiming", "secs uncertainty_secs press_secs press_time match_time result"
+)
+
+
+def time_to_frame(key, condition, timeout_secs=30):
+    """Presses key and times the first captured frame where condition holds
+
+    Times are taken from a monotonic clock. The capture timestamp of each
+    frame is moved to that clock, so the KPI does not include the time the
+    check takes or the polling interval of a wait_for_match.
+
+    Example:
+        timing = time_to_frame(RCU.OK, page_atleti.match_initial_screen)
+
+    Args:
+        key (str): RCU key that starts the measurement
+        condition (callable): condition(frame) returns a truthy value (for
+        example a stbt.MatchResult) when the target is in frame
+        timeout_secs (int, optional): Defaults to 30.
+
+    Returns:
+        KpiTiming: None if condition did not hold within timeout_secs
+    """
+    # Frame timestamps are wall clock, measured against the same instant
+    offset = time.monotonic() - time.time()
+
+    press_time = time.monotonic()
+    stbt.press(key)
+    press_secs = time.monotonic() - press_time
+
+    previous_time = press_time
+
+    for frame in stbt.frames(timeout_secs=timeout_secs):
+        frame_time = frame.time + offset
+        if frame_time < press_time:
+            continue
+
+        result = condition(frame)
+
+        if result:
+            timing = KpiTiming(
+                frame_time - press_time,
+                frame_time - previous_time,
+                press_secs,
+                press_time,
+                frame_time,
+                result,
+            )
+            logger.info(
+                "{} to frame: {:.3f}s (+0/-{:.3f}s)".format(
+                    key, timing.secs, timing.uncertainty_secs
+                )
+            )
+            return timing
+
+        previous_time = frame_time
+
+    logger.error("{}: no matching frame in {}s".format(key, timeout_secs))
+    return None
+
+
+def time_to_match(key, image, timeout_secs=30, **kwargs):
+    """time_to_frame() where the target is a match of image
+
+    Args:
+        key (str): RCU key that starts the measurement
+        image (str or numpy.ndarray): reference image, resolved by stbt.match
+        timeout_secs (int, optional): Defaults to 30.
+        kwargs: region, match_parameters... passed to stbt.match
+
+    Returns:
+        KpiTiming: result is the stbt.MatchResult. None on timeout
+    """
+    return time_to_frame(
+        key, lambda frame: stbt.match(image, frame=frame, **kwargs), timeout_secs
+    )
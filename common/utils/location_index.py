@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import stbt
+
+# Pixels added around the last known location to build the search window
+DEFAULT_MARGIN = 40
+
+
+class LocationIndex:
+    """Remembers where each reference image last matched on each page
+
+    Focus highlights and other elements searched in the full frame or in a
+    wide region usually show up at, or close to, the same place as before.
+    The index returns a small search window around the last location, so
+    the wide search is only needed when the element is not found there.
+    """
+
+    def __init__(self, margin=DEFAULT_MARGIN):
+        self.margin = margin
+        self.hits = 0
+        self.misses = 0
+        self._locations = {}
+        self._lock = threading.Lock()
+
+    def window(self, key, region=stbt.Region.ALL):
+        """Returns search window around last location of key
+
+        Args:
+            key (tuple): (page name, image)
+            region (stbt.Region, optional): declared search region.
+            Defaults to stbt.Region.ALL.
+
+        Returns:
+            stbt.Region: window inside the declared region. None if unknown
+        """
+        last = self._locations.get(key)
+
+        if last is None:
+            return None
+
+        window = last.extend(
+            x=-self.margin, y=-self.margin, right=self.margin, bottom=self.margin
+        )
+
+        return stbt.Region.intersect(window, region)
+
+    def update(self, key, location):
+        """Stores last location of key"""
+        with self._lock:
+            self._locations[key] = location
+
+    def forget(self, key):
+        """Drops last location of key"""
+        with self._lock:
+            self._locations.pop(key, None)
+
+    def clear(self):
+        """Drops every known location and resets statistics"""
+        with self._lock:
+            self._locations.clear()
+            self.hits = self.misses = 0
+
+    def record(self, hit):
+        """Counts the outcome of a search in a window"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        """Returns dict with hits, misses and known locations"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "locations": len(self._locations),
+        }
+
+
+index = LocationIndex()
@@ -5,6 +5,7 @@ import stbt
 from common.pages.home import page_home
 from common.pages.guia import page_guia
 from common.utils import get_time_and_date as gt
+from common.utils import key_timing
 from common.utils.rcu import RCU
 
 
@@ -29,12 +30,14 @@ def assert_time():
     return gt.assert_current_time_and_date(time)
 
 
-def send_num_rcu_keys(num_key_list):
+def send_num_rcu_keys(num_key_list, interval_secs=None):
     """Send sequence of numerical keys from RCU
     Expects list of ints from 0-9.
 
     Args:
         num_key_list (list): list of ints
+        interval_secs (float, optional): gap between digits. Defaults to the
+        key gap of the timing profile of the STB model.
     """
     assert isinstance(num_key_list, list)
 
@@ -49,6 +52,28 @@ def send_num_rcu_keys(num_key_list):
     rcu = vars(RCU)
     converted_digit_list = [rcu["NUMERIC_" + str(digit)] for digit in num_key_list]
 
+    if interval_secs is None:
+        interval_secs = key_timing.get_profile().key_gap_secs
+
     for index, digit in enumerate(converted_digit_list):
+        if index:
+            time.sleep(interval_secs)
         stbt.press(digit)
-        time.sleep(0.5)
+
+
+def send_key_burst(key, count, interval_secs=None):
+    """Send the same RCU key count times without waiting for the screen
+    between presses
+
+    Args:
+        key (str): RCU key
+        count (int): number of presses
+        interval_secs (float, optional): gap between presses. Defaults to the
+        key gap of the timing profile of the STB model.
+    """
+    if interval_secs is None:
+        interval_secs = key_timing.get_profile().key_gap_secs
+
+    for _ in range(count):
+        stbt.press(key)
+        time.sleep(interval_secs)
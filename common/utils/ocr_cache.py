@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+import atexit
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+import stbt
+
+from common.utils import storage
+from common.utils.frames import crop
+
+logger = logging.getLogger(__file__)
+
+# Number of results kept on disk. Least recently used ones are evicted
+DEFAULT_MAX_ENTRIES = 50000
+
+# Eviction is checked every EVICTION_INTERVAL new results
+EVICTION_INTERVAL = 200
+
+# Last used times of hits are kept in memory and written every TOUCH_BATCH
+# hits, with the next new result or at exit
+TOUCH_BATCH = 500
+
+
+class OcrCache:
+    """Content-addressed cache of OCR results persisted in a SQLite file
+
+    Results are keyed by a hash of the pixels of the cropped region plus
+    the OCR parameters (mode, lang, text_color, threshold, etc), so
+    identical pixels never go through tesseract twice, even across runs.
+    """
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._touched = {}
+        self._db = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self):
+        if self._db is None:
+            path = self.path or storage.data_path("ocr_cache.sqlite")
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS ocr "
+                "(key TEXT PRIMARY KEY, value TEXT, used REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ocr_used ON ocr (used)")
+            self._db.commit()
+
+        return self._db
+
+    @staticmethod
+    def key(frame, region, params):
+        """Returns hash of the region pixels and the OCR parameters
+
+        Args:
+            frame (stbt.Frame): captured frame
+            region (stbt.Region): OCR region
+            params (obj): hashable description of the OCR parameters
+
+        Returns:
+            str: hex digest
+        """
+        pixels = crop(frame, region)
+        version = getattr(stbt, "__version__", "")
+        digest = hashlib.sha1()
+        digest.update(repr((region, params, version)).encode())
+
+        if pixels is not None:
+            digest.update(repr(pixels.shape).encode())
+            digest.update(pixels.tobytes())
+
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Returns stored value or None"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT value FROM ocr WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            # The LRU timestamp is written later, hits do not touch the disk
+            self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH:
+                self._write_touched()
+                self.db.commit()
+
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        """Stores value, evicting least recently used results if needed"""
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO ocr (key, value, used) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time()),
+            )
+            self._puts += 1
+            self._write_touched()
+            if self._puts % EVICTION_INTERVAL == 0:
+                self._evict()
+            self.db.commit()
+
+    def flush(self):
+        """Writes the last used times of the hits kept in memory"""
+        with self._lock:
+            if self._touched:
+                self._write_touched()
+                self.db.commit()
+
+    def cached(self, frame, region, params, compute):
+        """Returns stored result for the region pixels or computes it
+
+        Args:
+            frame (stbt.Frame): captured frame
+            region (stbt.Region): OCR region
+            params (obj): hashable description of the OCR parameters
+            compute (callable): runs the OCR. Must return JSON serializable data
+        """
+        key = self.key(frame, region, params)
+
+        try:
+            value = self.get(key)
+        except sqlite3.Error as e:
+            logger.error("OCR cache not available: {}".format(e))
+            return compute()
+
+        if value is None:
+            value = compute()
+            try:
+                self.put(key, value)
+            except sqlite3.Error as e:
+                logger.error("OCR cache not available: {}".format(e))
+
+        return value
+
+    def stats(self):
+        """Returns dict with hits, misses and stored results"""
+        with self._lock:
+            entries = self.db.execute("SELECT COUNT(*) FROM ocr").fetchone()[0]
+
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def _write_touched(self):
+        if not self._touched:
+            return
+
+        self.db.executemany(
+            "UPDATE ocr SET used = ? WHERE key = ?",
+            [(used, key) for key, used in self._touched.items()],
+        )
+        self._touched = {}
+
+    def _evict(self):
+        excess = self.db.execute("SELECT COUNT(*) FROM ocr").fetchone()[0]
+        excess -= self.max_entries
+
+        if excess > 0:
+            self.db.execute(
+                "DELETE FROM ocr WHERE key IN "
+                "(SELECT key FROM ocr ORDER BY used LIMIT ?)",
+                (excess,),
+            )
+
+
+cache = OcrCache()
+
+
+def _flush():
+    try:
+        cache.flush()
+    except sqlite3.Error as e:
+        logger.error("OCR cache not available: {}".format(e))
+
+
+# Keeps the LRU order of the hits of the last batch
+atexit.register(_flush)
+
+
+def ocr(frame, region=stbt.Region.ALL, **kwargs):
+    """stbt.ocr that skips tesseract when the region pixels were already read"""
+    params = ("ocr", sorted((k, repr(v)) for k, v in kwargs.items()))
+
+    return cache.cached(
+        frame,
+        region,
+        params,
+        lambda: stbt.ocr(frame=frame, region=region, **kwargs),
+    )
+
+
+def match_text(text, frame, region=stbt.Region.ALL, **kwargs):
+    """stbt.match_text that skips tesseract when the region pixels were
+    already searched for the same text
+    """
+    params = ("match_text", text, sorted((k, repr(v)) for k, v in kwargs.items()))
+
+    def compute():
+        result = stbt.match_text(text, frame=frame, region=region, **kwargs)
+        return {
+            "match": bool(result.match),
+            "region": _region_to_list(result.region),
+            "text": result.text,
+        }
+
+    value = cache.cached(frame, region, params, compute)
+
+    return stbt.TextMatchResult(
+        time=getattr(frame, "time", None),
+        match=value["match"],
+        region=_list_to_region(value["region"]),
+        frame=frame,
+        text=value["text"],
+    )
+
+
+def _region_to_list(region):
+    if region is None:
+        return None
+    return [region.x, region.y, region.width, region.height]
+
+
+def _list_to_region(values):
+    if values is None:
+        return None
+    x, y, width, height = values
+    return stbt.Region(x, y, width=width, height=height)
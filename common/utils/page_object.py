@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+import sys
+import threading
+from collections import namedtuple
+from multiprocessing.pool import ThreadPool
+
+import stbt
+
+from common.exceptions import NotInScreen
+from common.utils import frames, location_index, ocr_cache, templates
+
+# Workers used to evaluate page properties concurrently in snapshot()
+SNAPSHOT_WORKERS = 6
+
+_pool = None
+_pool_lock = threading.Lock()
+_snapshot_types = {}
+
+
+class PageObject(stbt.FrameObject):
+    """Base class for the Page Objects
+
+    Behaves like stbt.FrameObject, but the image analysis done through the
+    _match, _ocr and _match_text helpers is memoized for the captured frame.
+    Reading a property several times, or two properties that share the same
+    match, only runs the analysis once per frame.
+
+    Results are keyed by (frame identity, region, parameters) and are dropped
+    when the page is refreshed. Reference images are served decoded by the
+    process-wide template registry and OCR results are also kept in the
+    on-disk OCR cache.
+    """
+
+    def __init__(self, frame=None):
+        if frame is None:
+            frame = frames.get_frame()
+        super(PageObject, self).__init__(frame=frame)
+        self._analysis_cache = {}
+
+    def refresh(self, frame=None, **kwargs):
+        """Drops the memoized results and returns a page with a new frame"""
+        self._analysis_cache.clear()
+        return super(PageObject, self).refresh(frame=frame, **kwargs)
+
+    def snapshot(self, *names):
+        """Evaluates page properties concurrently over the captured frame
+
+        OCR and matching release the GIL, so the properties are evaluated on
+        a thread pool and the total time is bounded by the slowest one.
+
+        Example:
+            page.snapshot("event_title", "channel_number").channel_number
+
+        Args:
+            names (str): property names
+
+        Returns:
+            namedtuple: immutable record with one field per property
+        """
+        record = _snapshot_type(type(self), names)
+        values = _thread_pool().map(lambda name: getattr(self, name), names)
+
+        return record(*values)
+
+    @property
+    def _module_file(self):
+        """Path of the module that declares the page and its locators"""
+        return sys.modules[type(self).__module__].__file__
+
+    def _cached(self, key, analysis):
+        """Returns the result of analysis(), computing it once per frame
+
+        Args:
+            key (tuple): hashable description of the analysis
+            analysis (callable): function that runs the analysis
+        """
+        key = (id(self._frame),) + key
+
+        try:
+            return self._analysis_cache[key]
+        except KeyError:
+            result = self._analysis_cache[key] = analysis()
+            return result
+
+    def _match(
+        self, image, region=stbt.Region.ALL, match_parameters=None, track=False
+    ):
+        """Memoized stbt.match over the page frame
+
+        Args:
+            image (str): locator path
+            region (stbt.Region, optional): Defaults to stbt.Region.ALL.
+            match_parameters (stbt.MatchParameters, optional): Defaults to None.
+            track (bool, optional): search first around the location where the
+            image last matched in this page. Use it for full frame or wide
+            region searches. Defaults to False.
+        """
+        key = ("match", _freeze(image), region, _freeze(match_parameters))
+
+        def match(search_region):
+            return stbt.match(
+                templates.load(image, self._module_file),
+                frame=self._frame,
+                region=search_region,
+                match_parameters=match_parameters,
+            )
+
+        if not track:
+            return self._cached(key, lambda: match(region))
+
+        return self._cached(key, lambda: self._tracked_match(image, region, match))
+
+    def _tracked_match(self, image, region, match):
+        """Matches in the window given by the location index, then in region"""
+        key = (type(self).__name__, _freeze(image))
+        window = location_index.index.window(key, region)
+
+        if window is not None:
+            result = match(window)
+            location_index.index.record(bool(result))
+            if result:
+                # Follow elements that move a little at a time
+                location_index.index.update(key, result.region)
+                return result
+
+        result = match(region)
+
+        if result:
+            location_index.index.update(key, result.region)
+
+        return result
+
+    def _classify(self, template_set, region=stbt.Region.ALL):
+        """Memoized TemplateSet.classify over the page frame"""
+        key = ("classify", id(template_set), region)
+
+        return self._cached(
+            key, lambda: template_set.classify(self._frame, region=region)
+        )
+
+    def _ocr(self, region=stbt.Region.ALL, **kwargs):
+        """Memoized stbt.ocr over the page frame"""
+        key = ("ocr", region, _freeze(kwargs))
+
+        return self._cached(
+            key, lambda: ocr_cache.ocr(self._frame, region=region, **kwargs)
+        )
+
+    def _read_digits(self, reader, region, **kwargs):
+        """Memoized DigitReader.read over the page frame
+
+        Falls back to _ocr(region, **kwargs) when the reader is not confident.
+
+        Returns:
+            Reading: text and confidence
+        """
+        key = ("read_digits", reader.name, region, _freeze(kwargs))
+
+        return self._cached(
+            key,
+            lambda: reader.read(
+                self._frame, region, lambda: self._ocr(region=region, **kwargs)
+            ),
+        )
+
+    def _match_text(self, text, region=stbt.Region.ALL, **kwargs):
+        """Memoized stbt.match_text over the page frame"""
+        key = ("match_text", text, region, _freeze(kwargs))
+
+        return self._cached(
+            key,
+            lambda: ocr_cache.match_text(
+                text, self._frame, region=region, **kwargs
+            ),
+        )
+
+
+def assert_visible(page_cls, name):
+    """Captures the page once and returns it if visible
+
+    The same validated instance is returned, so the caller does not need to
+    capture and check the screen again.
+
+    Args:
+        page_cls (class): PageObject subclass
+        name (str): module name used in the exception
+
+    Raises:
+        NotInScreen: if page is not visible
+
+    Returns:
+        [obj]: [Returns instance of page]
+    """
+    page = page_cls()
+
+    if page.is_visible:
+        return page
+
+    raise NotInScreen(name)
+
+
+def _thread_pool():
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPool(SNAPSHOT_WORKERS)
+
+    return _pool
+
+
+def _snapshot_type(page_cls, names):
+    """Returns namedtuple class for a snapshot of page_cls properties"""
+    key = (page_cls, names)
+
+    if key not in _snapshot_types:
+        _snapshot_types[key] = namedtuple(page_cls.__name__ + "Snapshot", names)
+
+    return _snapshot_types[key]
+
+
+def _freeze(value):
+    """Returns a hashable representation of an analysis parameter
+
+    Args:
+        value (obj): parameter value (dict of kwargs, MatchParameters, etc)
+
+    Returns:
+        obj: value itself if hashable, otherwise a hashable equivalent
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+
+    if hasattr(value, "shape"):
+        # Decoded images are compared by identity
+        return ("ndarray", id(value))
+
+    if isinstance(value, stbt.MatchParameters):
+        # MatchParameters hashes by identity, so compare it by its attributes
+        return ("MatchParameters", _freeze(vars(value)))
+
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    else:
+        return value
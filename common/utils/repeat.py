@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import logging
+
+import stbt
+
+from common.pages.apps import page_apps
+from common.utils import screen_navigator
+from common.utils.rcu import RCU
+
+logger = logging.getLogger(__file__)
+
+# Time for the Apps row to be back after leaving a Living App
+RESET_TIMEOUT_SECS = 10
+
+
+class RepeatHarness:
+    """Repeats a measured segment starting every time from the same state
+
+    setup() brings the device to the state before the measurement the long
+    way (for example from home). After each iteration reset() takes the
+    shortest path back to that state and returns True if it got there, so
+    the next iteration starts warm. When reset() fails or raises, the next
+    iteration runs setup() again.
+
+    Example:
+        harness = RepeatHarness(setup, open_app, reset)
+        kpi = harness.run(15)
+    """
+
+    def __init__(self, setup, measure, reset=None):
+        """__init__
+
+        Args:
+            setup (callable): brings the device to the initial state
+            measure (callable): measured segment. Returns the value stored
+            for the iteration
+            reset (callable, optional): returns the device to the initial
+            state and returns True if it was reached. Defaults to None,
+            setup() before every iteration.
+        """
+        self.setup = setup
+        self.measure = measure
+        self.reset = reset
+        self.setups = 0
+        self.resets = 0
+
+    def run(self, repeat):
+        """Runs measure() repeat times
+
+        Args:
+            repeat (int): number of iterations
+
+        Returns:
+            list: values returned by measure()
+        """
+        values = []
+        warm = False
+        self.setups = 0
+        self.resets = 0
+
+        for i in range(repeat):
+            if not warm:
+                self.setup()
+                self.setups += 1
+
+            values.append(self.measure())
+            stbt.draw_text("Execution {} of {}".format(i + 1, repeat))
+
+            warm = i + 1 < repeat and self._reset()
+
+        logger.info(
+            "{} iterations: {} setups, {} warm resets".format(
+                repeat, self.setups, self.resets
+            )
+        )
+
+        return values
+
+    def _reset(self):
+        if self.reset is None:
+            return False
+
+        try:
+            reached = bool(self.reset())
+        except Exception as e:
+            logger.warning("Reset failed: {!r}".format(e))
+            reached = False
+
+        if reached:
+            self.resets += 1
+        else:
+            logger.warning("Initial state not reached, running setup again")
+
+        return reached
+
+
+def app_launch(app):
+    """Returns (setup, reset) to repeat launching app from the Apps row
+
+    setup() goes to Apps from the current screen and focuses app. reset()
+    leaves the Living App with EXIT and checks that the Apps row is back
+    with app focused, ready for the next RCU.OK.
+
+    Args:
+        app (str): value of page_apps.App
+    """
+
+    def setup():
+        screen_navigator.navigator.forget()
+        screen_navigator.go_to("apps")
+        assert page_apps.navigate_to_app(app)
+
+    def reset():
+        stbt.press(RCU.EXIT)
+        if not stbt.wait_until(page_apps.is_visible, timeout_secs=RESET_TIMEOUT_SECS):
+            return False
+        return bool(page_apps.navigate_to_app(app))
+
+    return setup, reset
@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import stbt
+
+logger = logging.getLogger(__file__)
+
+# State name in transitions that matches any state
+ANY_STATE = "*"
+
+# Virtual time consumed by a key press
+PRESS_SECS = 0.1
+
+Transition = namedtuple("Transition", "key frame status")
+Motion = namedtuple("Motion", "time motion region frame")
+
+
+class FrameSource:
+    """Recorded frames of one screen state
+
+    Args:
+        path (str): PNG file, directory with PNG files (played in name
+        order) or video file
+        loop (bool, optional): restart the sequence when it ends instead of
+        holding the last frame. Defaults to False.
+    """
+
+    def __init__(self, path, loop=False):
+        self.path = path
+        self.loop = loop
+        self._images = None
+
+    @property
+    def images(self):
+        if self._images is None:
+            self._images = _read_images(self.path)
+            if not self._images:
+                raise IOError("No frames found in {}".format(self.path))
+
+        return self._images
+
+    def image_at(self, index):
+        """Returns image at index of the sequence"""
+        images = self.images
+
+        if self.loop:
+            return images[index % len(images)]
+
+        return images[min(index, len(images) - 1)]
+
+
+class ScriptedDevice:
+    """State machine that stands in for the decoder
+
+    Each state shows a FrameSource and each (state, key) transition moves
+    the device to another state. Keys without transition are ignored.
+
+    Example:
+        device = ScriptedDevice(
+            states={"home": FrameSource("home.png"), "guia": ...},
+            transitions={("home", RCU.EPG): "guia", ("*", RCU.MENU): "home"},
+            initial="home",
+        )
+    """
+
+    def __init__(self, states, transitions, initial, fps=25):
+        self.states = states
+        self.transitions = transitions
+        self.fps = fps
+        self.presses = []
+        self.time = 0.0
+        # Wall clock time of the device time 0, for the frame timestamps
+        self.epoch = 0.0
+        self._state = None
+        self._entered = 0.0
+        self.state = initial
+
+    @classmethod
+    def from_json(cls, path):
+        """Loads device script from JSON file
+
+        Paths of the states are relative to the JSON file.
+
+        Example:
+            {
+                "initial": "home",
+                "fps": 25,
+                "states": {"home": "home/", "live": {"path": "live.mp4", "loop": true}},
+                "transitions": [["home", "KEY_EPG", "guia"], ["*", "KEY_MENU", "home"]]
+            }
+        """
+        with open(path, "r") as f:
+            script = json.load(f)
+
+        base_dir = os.path.dirname(os.path.abspath(path))
+
+        states = {}
+        for name, source in script["states"].items():
+            if not isinstance(source, dict):
+                source = {"path": source}
+            states[name] = FrameSource(
+                os.path.join(base_dir, source["path"]), loop=source.get("loop", False)
+            )
+
+        transitions = dict(
+            ((state, key), target) for state, key, target in script["transitions"]
+        )
+
+        return cls(states, transitions, script["initial"], fps=script.get("fps", 25))
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        if state not in self.states:
+            raise ValueError("Unknown state: {}".format(state))
+
+        self._state = state
+        self._entered = self.time
+
+    def press(self, key):
+        """Applies key to the state machine and consumes PRESS_SECS"""
+        self.presses.append(key)
+        self.time += PRESS_SECS
+
+        target = self.transitions.get(
+            (self._state, key), self.transitions.get((ANY_STATE, key))
+        )
+
+        if target is None:
+            logger.info("{}: {} ignored".format(self._state, key))
+        else:
+            logger.info("{}: {} -> {}".format(self._state, key, target))
+            self.state = target
+
+    def sleep(self, secs):
+        self.time += secs
+
+    def get_frame(self):
+        """Returns next frame of the current state, one frame interval later"""
+        self.time += 1.0 / self.fps
+        index = int((self.time - self._entered) * self.fps)
+        image = self.states[self._state].image_at(index)
+
+        return stbt.Frame(image, time=self.epoch + self.time)
+
+
+class VirtualClock:
+    """Context manager that moves time.sleep, time.time and time.monotonic
+    to the virtual time of a ScriptedDevice
+
+    Only the thread that enters the context sees the virtual clock, so
+    worker threads (like the pool of PageObject.snapshot) keep the real one.
+    The three functions move together, so deadlines computed with
+    time.time() or time.monotonic() advance with the sleeps and the frames.
+    """
+
+    PATCHED = ("sleep", "time", "monotonic")
+
+    def __init__(self, device):
+        self.device = device
+        self._real = {}
+        self._thread = None
+        self._time = 0.0
+        self._monotonic = 0.0
+
+    def __enter__(self):
+        self._real = dict((name, getattr(time, name)) for name in self.PATCHED)
+        self._thread = threading.current_thread().ident
+        self._time = self._real["time"]() - self.device.time
+        self._monotonic = self._real["monotonic"]() - self.device.time
+        self.device.epoch = self._time
+
+        for name in self.PATCHED:
+            setattr(time, name, self._patch(name))
+
+        return self
+
+    def __exit__(self, *args):
+        for name, function in self._real.items():
+            setattr(time, name, function)
+        self._real = {}
+
+    def _patch(self, name):
+        real = self._real[name]
+        virtual = {
+            "sleep": self.device.sleep,
+            "time": self._time_now,
+            "monotonic": self._monotonic_now,
+        }[name]
+
+        def function(*args):
+            if threading.current_thread().ident != self._thread:
+                return real(*args)
+            return virtual(*args)
+
+        return function
+
+    def _time_now(self):
+        return self._time + self.device.time
+
+    def _monotonic_now(self):
+        return self._monotonic + self.device.time
+
+
+class ReplayBackend:
+    """Replaces stbt capture and remote control with a ScriptedDevice
+
+    While active, the stbt functions used by the page objects (frame
+    capture, press, wait and match helpers) run against the device script
+    in virtual time, so navigation helpers run deterministically at full
+    speed and without a decoder. With fast, the thread that installs the
+    backend also gets time.sleep, time.time and time.monotonic from the
+    virtual clock (see VirtualClock).
+
+    Example:
+        with ReplayBackend(ScriptedDevice.from_json("tc1.json")):
+            page_home.access_menu("AJUSTES")
+    """
+
+    PATCHED = (
+        "get_frame",
+        "frames",
+        "press",
+        "press_and_wait",
+        "press_until_match",
+        "wait_for_match",
+        "wait_for_motion",
+        "wait_until",
+        "match",
+        "match_text",
+        "ocr",
+        "draw_text",
+    )
+
+    def __init__(self, device, fast=True):
+        self.device = device
+        self.fast = fast
+        self._stbt = {}
+        self._clock = None
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *args):
+        self.uninstall()
+
+    def install(self):
+        for name in self.PATCHED:
+            self._stbt[name] = getattr(stbt, name)
+            setattr(stbt, name, getattr(self, name))
+
+        if self.fast:
+            self._clock = VirtualClock(self.device)
+            self._clock.__enter__()
+
+    def uninstall(self):
+        for name, function in self._stbt.items():
+            setattr(stbt, name, function)
+        self._stbt = {}
+
+        if self._clock is not None:
+            self._clock.__exit__(None, None, None)
+            self._clock = None
+
+    def get_frame(self):
+        return self.device.get_frame()
+
+    def frames(self, timeout_secs=None):
+        start = self.device.time
+        while timeout_secs is None or self.device.time - start < timeout_secs:
+            yield self.device.get_frame()
+
+    def press(self, key, interpress_delay_secs=None, hold_secs=None):
+        self.device.press(key)
+
+    def press_and_wait(self, key, *args, **kwargs):
+        self.device.press(key)
+        self.device.sleep(kwargs.get("stable_secs", 1))
+        return Transition(key, self.device.get_frame(), "stable")
+
+    def press_until_match(
+        self,
+        key,
+        image,
+        interval_secs=None,
+        max_presses=None,
+        match_parameters=None,
+        region=stbt.Region.ALL,
+    ):
+        max_presses = 10 if max_presses is None else max_presses
+
+        for i in range(max_presses + 1):
+            frame = self.device.get_frame()
+            result = self.match(
+                image, frame=frame, match_parameters=match_parameters, region=region
+            )
+            if result:
+                return result
+            if i < max_presses:
+                self.device.press(key)
+                self.device.sleep(3 if interval_secs is None else interval_secs)
+
+        raise stbt.MatchTimeout(frame, _name(image), max_presses)
+
+    def wait_for_match(
+        self,
+        image,
+        timeout_secs=10,
+        consecutive_matches=1,
+        match_parameters=None,
+        region=stbt.Region.ALL,
+        frames=None,
+    ):
+        matches = 0
+        frame = None
+
+        for frame in self.frames(timeout_secs):
+            result = self.match(
+                image, frame=frame, match_parameters=match_parameters, region=region
+            )
+            matches = matches + 1 if result else 0
+            if matches >= consecutive_matches:
+                return result
+
+        raise stbt.MatchTimeout(frame, _name(image), timeout_secs)
+
+    def wait_for_motion(self, timeout_secs=10, mask=None, **kwargs):
+        previous = None
+
+        for frame in self.frames(timeout_secs):
+            if previous is not None and cv2.absdiff(frame, previous).any():
+                return Motion(frame.time, True, None, frame)
+            previous = frame
+
+        raise stbt.MotionTimeout(previous, mask, timeout_secs)
+
+    def wait_until(self, callable_, timeout_secs=10, interval_secs=0, **kwargs):
+        start = self.device.time
+
+        while True:
+            result = callable_()
+            if result or self.device.time - start >= timeout_secs:
+                return result
+            self.device.sleep(max(interval_secs, 1.0 / self.device.fps))
+
+    def match(self, image, frame=None, **kwargs):
+        if frame is None:
+            frame = self.device.get_frame()
+        return self._stbt["match"](image, frame=frame, **kwargs)
+
+    def match_text(self, text, frame=None, **kwargs):
+        if frame is None:
+            frame = self.device.get_frame()
+        return self._stbt["match_text"](text, frame=frame, **kwargs)
+
+    def ocr(self, frame=None, **kwargs):
+        if frame is None:
+            frame = self.device.get_frame()
+        return self._stbt["ocr"](frame=frame, **kwargs)
+
+    def draw_text(self, text, duration_secs=3):
+        logger.info("draw_text: {}".format(text))
+
+
+def _read_images(path):
+    """Decodes PNG file, directory of PNG files or video file"""
+    if os.path.isdir(path):
+        return [cv2.imread(f) for f in sorted(glob.glob(os.path.join(path, "*.png")))]
+
+    if path.endswith(".png"):
+        return [cv2.imread(path)]
+
+    images = []
+    video = cv2.VideoCapture(path)
+    try:
+        while True:
+            ok, image = video.read()
+            if not ok:
+                break
+            images.append(image)
+    finally:
+        video.release()
+
+    return images
+
+
+def _name(image):
+    return image if isinstance(image, str) else "<Image>"
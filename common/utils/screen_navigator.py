@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+import heapq
+import itertools
+import logging
+from collections import namedtuple
+
+import stbt
+
+from common.exceptions import NotFound, NotInScreen
+from common.la.atleti import page_atleti
+from common.la.covid import page_covid
+from common.pages.ajustes import page_ajustes
+from common.pages.apps import page_apps
+from common.pages.apps.page_apps import App
+from common.pages.bloqueo_de_canales import page_bloqueo_de_canales
+from common.pages.en_vivo import page_en_vivo
+from common.pages.guia import page_guia
+from common.pages.home import page_home
+from common.pages.pin import page_pin
+from common.utils.rcu import RCU
+
+logger = logging.getLogger(__file__)
+
+# Source of the edges that can be taken from any screen
+ANY_SCREEN = "*"
+
+# Times the navigator locates the current screen again and replans
+MAX_REPLANS = 1
+
+Edge = namedtuple("Edge", "source target action cost checkpoint timeout_secs")
+
+
+class ScreenGraph:
+    """Screens and the RCU actions that move between them
+
+    Every screen has a check that returns True when it is visible. Every
+    edge has an action, a cost (estimated seconds) and tells if landing on
+    its target must be verified (checkpoint). Edges whose action only sends
+    keys are not verified until the next checkpoint or the final target.
+    """
+
+    def __init__(self):
+        self.checks = {}
+        self.edges = {}
+        self.locatable = []
+
+    def add_screen(self, name, is_visible, locatable=True):
+        """Adds screen
+
+        Args:
+            name (str): screen name
+            is_visible (callable): returns True if the screen is visible
+            locatable (bool, optional): False if is_visible sends keys, so it
+            is only called after navigating to the screen. Defaults to True.
+        """
+        self.checks[name] = is_visible
+        self.edges.setdefault(name, [])
+        if locatable:
+            self.locatable.append(name)
+
+    def add_edge(
+        self, source, target, action, cost=1.0, checkpoint=False, timeout_secs=0
+    ):
+        """Adds transition between screens
+
+        Args:
+            source (str): screen name, or ANY_SCREEN
+            target (str): screen name
+            action (callable): sends the RCU keys of the transition
+            cost (float, optional): estimated seconds. Defaults to 1.0.
+            checkpoint (bool, optional): verify target after the action.
+            Defaults to False.
+            timeout_secs (int, optional): time to wait for the target when
+            it is verified. Defaults to 0 (checked once).
+        """
+        edge = Edge(source, target, action, cost, checkpoint, timeout_secs)
+        self.edges.setdefault(source, []).append(edge)
+
+    def neighbours(self, screen):
+        """Returns edges leaving screen, including the ANY_SCREEN ones"""
+        return self.edges.get(screen, []) + [
+            edge for edge in self.edges.get(ANY_SCREEN, []) if edge.target != screen
+        ]
+
+    def plan(self, source, target):
+        """Returns cheapest list of edges from source to target (Dijkstra)
+
+        Raises:
+            NotFound: if target can not be reached
+        """
+        if source == target:
+            return []
+
+        counter = itertools.count()
+        queue = [(0.0, next(counter), source, [])]
+        visited = set()
+
+        while queue:
+            cost, _, screen, path = heapq.heappop(queue)
+
+            if screen == target:
+                return path
+
+            if screen in visited:
+                continue
+            visited.add(screen)
+
+            for edge in self.neighbours(screen):
+                if edge.target not in visited:
+                    heapq.heappush(
+                        queue,
+                        (cost + edge.cost, next(counter), edge.target, path + [edge]),
+                    )
+
+        raise NotFound("No path from {} to {}".format(source, target))
+
+    def is_visible(self, screen, timeout_secs=0):
+        """Returns True if screen is visible within timeout_secs"""
+        check = self.checks[screen]
+
+        if timeout_secs:
+            return bool(stbt.wait_until(check, timeout_secs=timeout_secs))
+
+        return bool(check())
+
+
+class Navigator:
+    """Moves the device to a screen following the cheapest path of a graph
+
+    The navigator remembers the screen it believes the device is on, so
+    consecutive calls do not locate it again. Only checkpoints and the
+    final target are verified. If a verification fails the current screen
+    is located again and the path is planned again from there.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.current = None
+
+    def locate(self):
+        """Returns the visible screen, checking the locatable ones.
+        None if unknown
+        """
+        for screen in self.graph.locatable:
+            if self.graph.is_visible(screen):
+                logger.info("Located screen: {}".format(screen))
+                return screen
+
+        return None
+
+    def forget(self):
+        """Drops the believed screen. Call it after moving outside the
+        navigator (for example pressing keys from a test)
+        """
+        self.current = None
+
+    def go_to(self, target):
+        """Navigates to target screen
+
+        Args:
+            target (str): screen name
+
+        Raises:
+            NotInScreen: if target is not reached
+        """
+        for _ in range(MAX_REPLANS + 1):
+            if self.current is None:
+                self.current = self.locate() or ANY_SCREEN
+
+            if self._follow(self.graph.plan(self.current, target)):
+                return True
+
+            self.current = None
+
+        raise NotInScreen(target)
+
+    def _follow(self, path):
+        """Runs the actions of path. Returns False if a checkpoint fails"""
+        if not path:
+            return self.graph.is_visible(self.current)
+
+        for edge in path:
+            logger.info("{} -> {}".format(edge.source, edge.target))
+            edge.action()
+            self.current = edge.target
+
+            if edge.checkpoint or edge is path[-1]:
+                if not self.graph.is_visible(edge.target, edge.timeout_secs):
+                    logger.error("Screen {} not reached".format(edge.target))
+                    return False
+
+        return True
+
+
+def _press(key, stable_secs=1):
+    return lambda: stbt.press_and_wait(key, timeout_secs=5, stable_secs=stable_secs)
+
+
+def _open_app(app, launched):
+    def action():
+        page_apps.navigate_to_app(app)
+        stbt.press(RCU.OK)
+        launched()
+
+    return action
+
+
+def default_graph():
+    """Returns graph with the screens of the page objects"""
+    graph = ScreenGraph()
+
+    graph.add_screen("home", page_home.is_visible)
+    # Live is checked opening the miniguide
+    graph.add_screen("live", page_en_vivo.is_visible, locatable=False)
+    graph.add_screen("guia", page_guia.is_visible)
+    graph.add_screen("ajustes", page_ajustes.is_visible)
+    graph.add_screen("pin", page_pin.is_visible)
+    graph.add_screen("bloqueo_de_canales", page_bloqueo_de_canales.is_in_page)
+    graph.add_screen("apps", page_apps.is_visible)
+    graph.add_screen("atleti", page_atleti.is_visible)
+    graph.add_screen("covid", page_covid.is_visible)
+
+    graph.add_edge(ANY_SCREEN, "home", _press(RCU.MENU, stable_secs=2), cost=3)
+    graph.add_edge("home", "live", _press(RCU.MENU, stable_secs=0.5), cost=2)
+    graph.add_edge("home", "guia", lambda: page_home.access_menu("GUIA"), cost=4)
+    graph.add_edge("home", "ajustes", lambda: page_home.access_menu("AJUSTES"), cost=4)
+    graph.add_edge("home", "apps", lambda: page_home.access_menu("APPS"), cost=4)
+    graph.add_edge("live", "guia", _press(RCU.EPG), cost=2)
+    graph.add_edge("guia", "live", _press(RCU.EXIT), cost=2)
+    graph.add_edge(
+        "ajustes",
+        "pin",
+        lambda: page_ajustes.access_ajustes("Bloqueo de canales"),
+        cost=3,
+        checkpoint=True,
+    )
+    graph.add_edge(
+        "pin",
+        "bloqueo_de_canales",
+        page_pin.insert_pin,
+        cost=3,
+        checkpoint=True,
+        timeout_secs=3,
+    )
+    graph.add_edge(
+        "apps",
+        "atleti",
+        _open_app(App.ATLETI, page_atleti.launched),
+        cost=30,
+        checkpoint=True,
+        timeout_secs=45,
+    )
+    graph.add_edge(
+        "apps",
+        "covid",
+        _open_app(App.COVID, page_covid.launched),
+        cost=30,
+        checkpoint=True,
+        timeout_secs=45,
+    )
+    graph.add_edge("atleti", "apps", _press(RCU.EXIT), cost=3)
+    graph.add_edge("covid", "apps", _press(RCU.EXIT), cost=3)
+
+    return graph
+
+
+navigator = Navigator(default_graph())
+
+
+def go_to(screen):
+    """Navigates to screen from the believed current one
+
+    Args:
+        screen (str): one of the screens of default_graph()
+    """
+    stbt.draw_text("Navigating to {}".format(screen))
+    return navigator.go_to(screen)
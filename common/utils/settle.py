@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+import stbt
+
+from common.utils.frames import crop, to_gray
+
+logger = logging.getLogger(__file__)
+
+# Modes of wait_for_settle
+STABLE = "stable"
+CHANGE = "change"
+
+# Difference of a pixel, in gray levels, that is not considered noise
+NOISE_THRESHOLD = 25
+
+# Pixels over NOISE_THRESHOLD needed to consider the region changed
+MIN_CHANGED_PIXELS = 20
+
+SettleResult = namedtuple("SettleResult", "settled secs frame")
+
+_stats = {"waits": 0, "timeouts": 0, "settle_secs": 0.0, "saved_secs": 0.0}
+_stats_lock = threading.Lock()
+
+
+def wait_for_settle(
+    region=stbt.Region.ALL,
+    mode=STABLE,
+    consecutive_frames=3,
+    timeout_secs=5,
+    replaces_secs=None,
+):
+    """Waits until region is stable, or has changed, comparing frames
+
+    STABLE returns when region has not changed for consecutive_frames frames
+    in a row. CHANGE returns when region differs from the first frame in
+    consecutive_frames frames in a row. The observed settle time is logged,
+    together with the seconds saved if the wait replaces a fixed sleep.
+
+    Args:
+        region (stbt.Region, optional): Defaults to stbt.Region.ALL.
+        mode (str, optional): STABLE or CHANGE. Defaults to STABLE.
+        consecutive_frames (int, optional): Defaults to 3.
+        timeout_secs (int, optional): maximum wait. Defaults to 5.
+        replaces_secs (float, optional): fixed sleep this wait replaces, only
+        used to log the saving. Defaults to None.
+
+    Returns:
+        SettleResult: settled is False if timeout_secs was reached
+    """
+    if mode not in (STABLE, CHANGE):
+        raise ValueError("Unknown settle mode: {}".format(mode))
+
+    start = time.time()
+    reference = None
+    count = 0
+    frame = None
+    settled = False
+
+    for frame in stbt.frames(timeout_secs=timeout_secs):
+        pixels = crop(frame, region)
+        if pixels is None:
+            raise ValueError("Region {} is outside the frame".format(region))
+        pixels = to_gray(pixels)
+
+        if reference is None:
+            reference = pixels
+            continue
+
+        changed = _changed(reference, pixels)
+
+        if mode == STABLE:
+            count = 0 if changed else count + 1
+            reference = pixels
+        else:
+            count = count + 1 if changed else 0
+
+        if count >= consecutive_frames:
+            settled = True
+            break
+
+    secs = time.time() - start
+    _record(mode, settled, secs, replaces_secs)
+
+    return SettleResult(settled, secs, frame)
+
+
+def stats():
+    """Returns dict with waits, timeouts and seconds waited and saved"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    """Resets the counters of stats()"""
+    with _stats_lock:
+        _stats.update(waits=0, timeouts=0, settle_secs=0.0, saved_secs=0.0)
+
+
+def _changed(previous, current):
+    difference = cv2.absdiff(previous, current)
+    return np.count_nonzero(difference > NOISE_THRESHOLD) >= MIN_CHANGED_PIXELS
+
+
+def _record(mode, settled, secs, replaces_secs):
+    saved = replaces_secs - secs if replaces_secs is not None else 0.0
+
+    with _stats_lock:
+        _stats["waits"] += 1
+        _stats["settle_secs"] += secs
+        _stats["saved_secs"] += saved
+        if not settled:
+            _stats["timeouts"] += 1
+
+    message = "Settle ({}) {} in {:.2f}s".format(
+        mode, "observed" if settled else "timed out", secs
+    )
+    if replaces_secs is not None:
+        message += ", {:+.2f}s saved over {}s sleep".format(saved, replaces_secs)
+
+    if settled:
+        logger.info(message)
+    else:
+        logger.warning(message)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import errno
+import os
+
+# Environment variable to override the directory of local stores
+DATA_DIR_ENV = "STB_AUTOMATION_DATA_DIR"
+
+DEFAULT_DATA_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "stb-tester-automation"
+)
+
+
+def data_path(filename):
+    """Returns path for a local store file, creating its directory if needed
+
+    Stores are kept out of the test working directory, so they survive
+    between runs. The directory can be changed with STB_AUTOMATION_DATA_DIR.
+
+    Args:
+        filename (str): name of the store file
+
+    Returns:
+        str: absolute path of the file
+    """
+    directory = os.environ.get(DATA_DIR_ENV, DEFAULT_DATA_DIR)
+
+    try:
+        os.makedirs(directory)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+    return os.path.join(directory, filename)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+from collections import namedtuple
+
+import cv2
+import numpy as np
+import stbt
+
+from common.utils import templates
+from common.utils.frames import crop, to_gray
+
+TemplateSetResult = namedtuple("TemplateSetResult", "label confidence match")
+
+
+class TemplateSet:
+    """Group of reference images that are searched in the same region
+
+    Instead of running one stbt.match per image, the region is cropped and
+    converted to grayscale once, every image is scored against it with
+    normalized cross-correlation and only the best candidate is confirmed
+    with stbt.match. Images with transparency are not scored, as their
+    transparent pixels would lower the score, and are always confirmed
+    with stbt.match after the scored candidates.
+
+    Example:
+        PARENTAL = TemplateSet([("TP", Img.PARENTAL_TP), ...], __file__)
+        PARENTAL.classify(frame, region).label
+    """
+
+    def __init__(self, images, module_file, threshold=0.6):
+        """__init__
+
+        Args:
+            images (list): list of (label, locator path) tuples
+            module_file (str): __file__ of the module that declares the locators
+            threshold (float, optional): minimum score to confirm a candidate.
+            Defaults to 0.6.
+        """
+        self.labels = [label for label, _ in images]
+        self.paths = [path for _, path in images]
+        self.module_file = module_file
+        self.threshold = threshold
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def images(self):
+        """Decoded images, in the same order as labels"""
+        return [self.image(i) for i in range(len(self.paths))]
+
+    def image(self, i):
+        """Decoded image of label i"""
+        return templates.load(self.paths[i], self.module_file)
+
+    def scores(self, frame, region=stbt.Region.ALL):
+        """Returns the best normalized cross-correlation of each image
+
+        Args:
+            frame (stbt.Frame): captured frame
+            region (stbt.Region, optional): Defaults to stbt.Region.ALL.
+
+        Returns:
+            numpy.ndarray: one score per label, -1 if the image does not fit
+            and nan if it has transparency
+        """
+        scores = np.full(len(self.labels), -1.0)
+
+        area = crop(frame, region)
+        if area is None:
+            return scores
+
+        area = to_gray(area)
+
+        for i, path in enumerate(self.paths):
+            template, mask = templates.registry.get_gray(path, self.module_file)
+            if mask is not None:
+                scores[i] = np.nan
+                continue
+            if (
+                template.shape[0] > area.shape[0]
+                or template.shape[1] > area.shape[1]
+            ):
+                continue
+            result = cv2.matchTemplate(area, template, cv2.TM_CCOEFF_NORMED)
+            scores[i] = result.max()
+
+        return scores
+
+    def classify(self, frame, region=stbt.Region.ALL):
+        """Returns the label of the image found in region
+
+        Candidates are confirmed with stbt.match from the best score down.
+        Only the best one is confirmed when the images are distinct enough.
+
+        Args:
+            frame (stbt.Frame): captured frame
+            region (stbt.Region, optional): Defaults to stbt.Region.ALL.
+
+        Returns:
+            TemplateSetResult: label, confidence and stbt.MatchResult.
+            label is None if no image was found
+        """
+        scores = self.scores(frame, region)
+        scored = [i for i in np.argsort(-scores) if scores[i] >= self.threshold]
+        transparent = [i for i in range(len(scores)) if np.isnan(scores[i])]
+
+        for i in scored + transparent:
+            match = stbt.match(self.image(i), frame=frame, region=region)
+            if match:
+                confidence = match.first_pass_result if i in transparent else scores[i]
+                return TemplateSetResult(self.labels[i], float(confidence), match)
+
+        finite = scores[~np.isnan(scores)]
+        return TemplateSetResult(None, float(finite.max()) if len(finite) else 0, None)
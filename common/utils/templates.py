@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+import os
+import logging
+import threading
+from collections import OrderedDict
+
+import cv2
+import stbt
+
+logger = logging.getLogger(__file__)
+
+# Root of the page objects. Reference images live in <page>/images/
+COMMON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Upper bound for decoded images kept in memory
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class TemplateRegistry:
+    """Process-wide cache of decoded reference images
+
+    The Img/App/MENU locators of the page objects are relative paths that
+    stbt resolves and decodes again on every match. The registry resolves
+    each path against the directory of the page module that declares it,
+    decodes it once into a numpy array and serves that array to every page.
+
+    The grayscale copy and transparency mask used by TemplateSet are kept
+    in the same cache. Least recently used entries are evicted when they
+    exceed max_bytes.
+    """
+
+    def __init__(self, root=COMMON_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_resident = 0
+        self._images = OrderedDict()
+        self._index = None
+        self._lock = threading.Lock()
+
+    @property
+    def index(self):
+        """Set of absolute paths of every reference image under root"""
+        if self._index is None:
+            index = set()
+            for dirpath, _, filenames in os.walk(self.root):
+                if os.path.basename(dirpath) != "images":
+                    continue
+                for filename in filenames:
+                    if filename.endswith(".png"):
+                        index.add(os.path.join(dirpath, filename))
+            self._index = index
+
+        return self._index
+
+    def get(self, path, module_file):
+        """Returns decoded image for a locator
+
+        Args:
+            path (str): locator path, relative to the page module (Ex: Img.LOGO)
+            module_file (str): __file__ of the module that declares the locator
+
+        Returns:
+            numpy.ndarray: decoded image
+        """
+        filename = resolve(path, module_file)
+
+        return self._cached(filename, lambda: self._decode(filename))
+
+    def get_gray(self, path, module_file):
+        """Returns grayscale copy and transparency mask of a locator
+
+        Returns:
+            tuple: (numpy.ndarray, numpy.ndarray) gray image and mask of the
+            opaque pixels. The mask is None if the image has no transparency
+        """
+        filename = resolve(path, module_file)
+
+        return self._cached(
+            (filename, "gray"), lambda: _gray_and_mask(self.get(path, module_file))
+        )
+
+    def stats(self):
+        """Returns cache statistics
+
+        Returns:
+            dict: hits, misses, evictions, entries, bytes_resident and known
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._images),
+                "bytes_resident": self.bytes_resident,
+                "known": len(self.index),
+            }
+
+    def clear(self):
+        """Drops every decoded image and resets statistics"""
+        with self._lock:
+            self._images.clear()
+            self.hits = self.misses = self.evictions = self.bytes_resident = 0
+
+    def _cached(self, key, build):
+        with self._lock:
+            entry = self._images.pop(key, None)
+            if entry is not None:
+                self.hits += 1
+                self._images[key] = entry
+                return entry
+            self.misses += 1
+
+        entry = build()
+
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = entry
+                self.bytes_resident += _nbytes(entry)
+            self._evict()
+
+        return entry
+
+    def _decode(self, filename):
+        if filename not in self.index:
+            logger.warning("Image {} is not a known reference image".format(filename))
+
+        return stbt.load_image(filename)
+
+    def _evict(self):
+        # Keeps at least the last entry, even if it is bigger than max_bytes
+        while self.bytes_resident > self.max_bytes and len(self._images) > 1:
+            _, entry = self._images.popitem(last=False)
+            self.bytes_resident -= _nbytes(entry)
+            self.evictions += 1
+
+
+def _gray_and_mask(image):
+    if image.ndim == 2:
+        return image, None
+
+    if image.shape[2] == 4:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+        alpha = image[:, :, 3]
+        mask = None if alpha.min() == 255 else alpha
+        return gray, mask
+
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), None
+
+
+def _nbytes(entry):
+    if isinstance(entry, tuple):
+        return sum(item.nbytes for item in entry if item is not None)
+    return entry.nbytes
+
+
+registry = TemplateRegistry()
+
+
+def resolve(path, module_file):
+    """Returns absolute path for a locator declared in module_file"""
+    if os.path.isabs(path):
+        return path
+
+    base_dir = os.path.dirname(os.path.abspath(module_file))
+    return os.path.normpath(os.path.join(base_dir, path))
+
+
+def load(image, module_file):
+    """Returns decoded image from the process-wide registry
+
+    Images that are already decoded (numpy arrays) are returned unchanged.
+
+    Args:
+        image (str or numpy.ndarray): locator path or decoded image
+        module_file (str): __file__ of the module that declares the locator
+
+    Returns:
+        numpy.ndarray: decoded image
+    """
+    if hasattr(image, "shape"):
+        return image
+
+    return registry.get(image, module_file)
+
+
+def stats():
+    """Returns statistics of the process-wide registry"""
+    return registry.stats()
@@ -1,9 +1,8 @@
 # -*- coding: utf-8 -*-
-from common.pages.ajustes import page_ajustes
 from common.pages.pin import page_pin
-from common.pages.home import page_home
 from common.pages.bloqueo_de_canales import page_bloqueo_de_canales
 from common.pages.en_vivo import page_en_vivo
+from common.utils import screen_navigator
 
 
 def test_main():
@@ -11,14 +10,8 @@ def test_main():
 
     CHANNEL = 4
 
-    # 1. Open  home
-    page_home.go_to_home()
-    # 2. Navigate to ajustes
-    page_home.access_menu("AJUSTES")
-    # 3. Navigate to Bloqueo de canales
-    page_ajustes.access_ajustes("Bloqueo de canales")
-    # 4. Insert pin
-    page_pin.insert_pin()
+    # 1-4. Home > Ajustes > Bloqueo de canales > Insert pin
+    screen_navigator.go_to("bloqueo_de_canales")
     # 5. Navigate to desired channel
     page_bloqueo_de_canales.navigate_to_channel(CHANNEL)
     # 6. Block desired channel
@@ -25,11 +25,15 @@ def test_main():
     page_en_vivo.go_to_live()
     # 2. Zap to channel
     page_en_vivo.zap_to_ch(CHANNEL, unblock=False)
+    # Network settle window: the multicast stream of the new channel must be
+    # steady before the FCC capture starts. Live video changes on every
+    # frame, so the screen can not tell when the stream is settled
     time.sleep(10)
 
     capture_handler = net.NetworkCaptureHandler(live_config)
     capture_handler.start_live_capture()
 
+    # Capture window before and after zapping
     time.sleep(2)
 
     stbt.press(RCU.CHANNELUP)
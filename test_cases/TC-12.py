@@ -17,6 +17,7 @@ def test_main():
 
     while (time.time() - start) / 3600 < 6:
         # 4. Zap to channel
+        # Dwell time on each channel is part of the test, not a wait
         time.sleep(10)
         # 3. Zap to channel
         stbt.press(RCU.CHANNELUP)
@@ -13,12 +13,13 @@ def test_main():
     page_guia.open_guide()
 
     # 2. Get event metadata
-    metadata["event_title"] = page_guia.get_event_title()
-    metadata["parental_rate"] = page_guia.get_parental()
-    metadata["exihbition_times"] = page_guia.get_exihbition_times()
-    metadata["channel_number"] = page_guia.get_channel_number()
-    metadata["hd"] = page_guia.get_hd()
-    metadata["dolby"] = page_guia.get_dolby()
+    event = page_guia.get_event_metadata()
+    metadata["event_title"] = event.event_title
+    metadata["parental_rate"] = event.parental
+    metadata["exihbition_times"] = event.exihbition_times
+    metadata["channel_number"] = event.channel_number
+    metadata["hd"] = event.hd
+    metadata["dolby"] = event.dolby
 
     # Timer to display stbt.text on screen
     time.sleep(5)
@@ -1,10 +1,10 @@
 # -*- coding: utf-8 -*-
 import stbt
-import json
-from common.pages.home import page_home
+from common.utils import kpi_store
 from common.utils.rcu import RCU
-from common.pages.apps import page_apps
+from common.utils.repeat import RepeatHarness, app_launch
 from common.pages.apps.page_apps import App
+from common.pages.home import page_home
 from common.la.covid import page_covid
 from collections import Counter
 
@@ -12,37 +12,44 @@ from collections import Counter
 def test_main():
     """Splash Screen: Asistente COVID"""
 
-    # Stores kpi timing
-    splash = []
-
     # repetition times
     repeat = 20
 
-    for i in range(repeat):
+    # Each measurement is stored as it is taken
+    run = kpi_store.start_run("TC-4")
+
+    def open_app():
         # Open Living App
-        page_home.go_to_home()
-        page_home.access_menu("APPS")
-        page_apps.navigate_to_app(App.COVID)
         stbt.press(RCU.OK)
 
         # Confirms that splash screen was displayed
         try:
             assert page_covid.get_splash_screen()
         except AssertionError:
-            splash.append("Not displayed")
+            run.record("splash_displayed", 0)
             stbt.draw_text("Splash screen not shown")
+            return "Not displayed"
         else:
-            splash.append("Displayed")
+            run.record("splash_displayed", 1)
             stbt.draw_text("Splash screen displayed")
+            return "Displayed"
+
+    # The splash is only shown on a cold launch, so there is no warm reset:
+    # every launch leaves the app to home and opens it from Apps again
+    launch_setup, _ = app_launch(App.COVID)
 
-        # Log info in screen
-        stbt.draw_text("Execution {} of {}".format(i + 1, repeat))
+    def setup():
+        page_home.go_to_home()
+        launch_setup()
+
+    # Stores kpi timing
+    splash = RepeatHarness(setup, open_app).run(repeat)
 
-    # store values in file
-    with open("splash.json", "w") as f:
-        json.dump({"splash": splash}, f)
+    # store remaining values
+    run.close()
 
     # Counts how incidences of splash screen displayed/not displayed
     result = dict(Counter(splash))
 
     print("Result: {}".format(result))
+    print("All runs: {}".format(kpi_store.store.summary("TC-4", "splash_displayed")))
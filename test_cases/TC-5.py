@@ -1,10 +1,6 @@
 # -*- coding: utf-8 -*-
-import stbt
-from common.pages.home import page_home
-from common.utils.rcu import RCU
-from common.pages.apps import page_apps
-from common.pages.apps.page_apps import App
 from common.la.covid import page_covid
+from common.utils import screen_navigator
 
 
 def test_main():
@@ -14,10 +10,7 @@ def test_main():
     ans = [1, 1, 1, 1, 1, 1, 1, 1]
 
     # Open Livin App
-    page_home.go_to_home()
-    page_home.access_menu("APPS")
-    page_apps.navigate_to_app(App.COVID)
-    stbt.press(RCU.OK)
+    screen_navigator.go_to("covid")
 
     # 1. Assert initial screen
     assert page_covid.get_initial_screen()
@@ -1,10 +1,7 @@
 # -*- coding: utf-8 -*-
 import stbt
-from common.pages.home import page_home
-from common.utils.rcu import RCU
-from common.pages.apps import page_apps
-from common.pages.apps.page_apps import App
 from common.la.atleti import page_atleti
+from common.utils import screen_navigator
 from common.la.atleti.page_atleti import Img
 
 
@@ -12,10 +9,7 @@ def test_main():
     """Validates all pills have a video stream"""
 
     # Open LA
-    page_home.go_to_home()
-    page_home.access_menu("APPS")
-    page_apps.navigate_to_app(App.ATLETI)
-    stbt.press(RCU.OK)
+    screen_navigator.go_to("atleti")
 
     # Assert initial screen
     assert page_atleti.get_initial_screen()
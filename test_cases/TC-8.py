@@ -1,17 +1,17 @@
 # -*- coding: utf-8 -*-
 import stbt
-from common.pages.home import page_home
-from common.utils.rcu import RCU
-from common.pages.apps import page_apps
-from common.pages.apps.page_apps import App
 from common.la.atleti import page_atleti
+from common.utils import async_runtime, screen_navigator, templates
 from common.la.atleti.page_atleti import Img
 from utils.imports_utils import network_module, plot
 
 
 def test_main():
     """Validates ABR from video stream"""
+    async_runtime.run(main)
 
+
+async def main():
     # Live VoD Capture config
     vod_config = {
         "filter": "tcp port 80",
@@ -31,42 +31,51 @@ def test_main():
     plt = plot()
 
     # Open LA
-    page_home.go_to_home()
-    page_home.access_menu("APPS")
-    page_apps.navigate_to_app(App.ATLETI)
-    stbt.press(RCU.OK)
+    await async_runtime.to_thread(screen_navigator.go_to, "atleti")
 
     # Assert initial screen
-    assert page_atleti.get_initial_screen()
+    assert await async_runtime.to_thread(page_atleti.get_initial_screen)
 
     # Selects pill
-    page_atleti.select_pill(Img.PILL_ENTREVISTA)
-    stbt.press("KEY_OK")
-
-    # Start VoD Capture
-    capture_handler.start_vod_capture()
-
-    # Check if there is movement
-    if not page_atleti.detected_movement():
-        # Check if is in resume popup
-        if not page_atleti.is_continue_popup():
-            # Fails if not movement and not in resume popup
-            assert False
-        else:
-            # Select Start Over
-            page_atleti.select_start_over()
-            stbt.press("KEY_OK")
-            page_atleti.detected_movement()
-
-    # Wait end of video
-    page_atleti.wait_end_of_video()
-
-    # Stop VOD capture
-    vod_cap_data = capture_handler.stop_vod_capture()
+    await async_runtime.to_thread(page_atleti.select_pill, Img.PILL_ENTREVISTA)
+    await async_runtime.press("KEY_OK")
+
+    # VoD capture, memory and player motion run while the video plays
+    observers = async_runtime.observe(
+        async_runtime.PacketCapture(capture_handler, "vod"),
+        async_runtime.MemorySampler(),
+        async_runtime.MotionObserver(
+            mask=templates.resolve(Img.PLAYER_MASK, page_atleti.__file__)
+        ),
+    )
+
+    async with observers:
+        # Check if there is movement
+        if not await async_runtime.to_thread(page_atleti.detected_movement):
+            # Check if is in resume popup
+            if not await async_runtime.to_thread(page_atleti.is_continue_popup):
+                # Fails if not movement and not in resume popup
+                assert False
+            else:
+                # Select Start Over
+                await async_runtime.to_thread(page_atleti.select_start_over)
+                await async_runtime.press("KEY_OK")
+                await async_runtime.to_thread(page_atleti.detected_movement)
+
+        # Wait end of video
+        await async_runtime.to_thread(page_atleti.wait_end_of_video)
+
+    # VOD capture is stopped with the observers
+    vod_cap_data = observers.results["PacketCapture"]
     print(vod_cap_data)
+    print(observers.results["MemorySampler"])
+
+    # Frames without motion while the video played
+    motion = observers.results["MotionObserver"]
+    print("Frozen frames: {} of {}".format(sum(not m for _, m in motion), len(motion)))
 
     # Exit screen
-    stbt.press_and_wait("KEY_EXIT", stable_secs=1)
+    await async_runtime.to_thread(stbt.press_and_wait, "KEY_EXIT", stable_secs=1)
 
     # Create Vod Chart
     plt.CreateVodChart(plot_config, vod_cap_data)
@@ -1,10 +1,8 @@
 # -*- coding: utf-8 -*-
 import stbt
-import time
-import json
-from common.pages.home import page_home
+from common.utils import kpi_store, kpi_timer
 from common.utils.rcu import RCU
-from common.pages.apps import page_apps
+from common.utils.repeat import RepeatHarness, app_launch
 from common.pages.apps.page_apps import App
 from common.la.covid import page_covid
 from utils.imports_utils import plot
@@ -13,36 +11,45 @@ from utils.imports_utils import plot
 def test_main():
     """KPI for opening Living App: Asistente COVID"""
 
-    # Stores kpi timing
-    kpi = []
-
     # repetition times
     repeat = 50
 
-    for i in range(repeat):
-        # Open LA
-        page_home.go_to_home()
-        page_home.access_menu("APPS")
-        page_apps.navigate_to_app(App.COVID)
-        stbt.press(RCU.OK)
+    # Each measurement is stored as it is taken
+    run = kpi_store.start_run("TC-9")
 
-        # Calculates time until initial screen
-        start = time.time()
-        assert page_covid.get_initial_screen()
-        end = time.time()
-        kpi.append(end - start)
+    def open_app():
+        # Open Living App and calculates time from the key press to the
+        # first frame with the initial screen
+        timing = kpi_timer.time_to_frame(
+            RCU.OK, page_covid.match_initial_screen, timeout_secs=30
+        )
+        assert timing
 
         # Log info in screen
-        stbt.draw_text("Execution {} of {}".format(i + 1, repeat))
-        stbt.draw_text("Opened  in  {}s".format(round(end - start, 2)))
+        stbt.draw_text(
+            "Opened  in  {}s (-{}s)".format(
+                round(timing.secs, 2), round(timing.uncertainty_secs, 2)
+            )
+        )
+
+        run.record("app_access_time", timing.secs)
+
+        return timing.secs
+
+    # Only the launch is measured. Between launches the app is left with
+    # EXIT, back to the Apps row with the app focused
+    setup, reset = app_launch(App.COVID)
+
+    # Stores kpi timing
+    kpi = RepeatHarness(setup, open_app, reset).run(repeat)
 
-    # store values in file
-    with open("timings_demo.json", "w") as f:
-        json.dump({"app_access_time": kpi}, f)
+    # store remaining values
+    run.close()
 
     print("Max Time: {}".format(max(kpi)))
     print("Min Time: {}".format(min(kpi)))
     print("Avg Time: {}".format(sum(kpi) / len(kpi)))
+    print("All runs: {}".format(kpi_store.store.summary("TC-9", "app_access_time")))
 
     # Plots bar chart
     p = plot()
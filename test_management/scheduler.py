@@ -0,0 +1,290 @@
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+
+from device_access.device_access import DeviceInformation
+from test_management.test_management import GetTestScope, TestScope
+
+logger = logging.getLogger(__file__)
+
+TestResult = namedtuple("TestResult", "tc_id device passed duration error")
+
+# Tests queued per device before it has to wait or steal
+QUEUE_DEPTH = 2
+
+
+class DeviceSlot:
+    """Decoder of the rack that can run tests
+
+    Args:
+        name (str): unique device name
+        run_test (callable): run_test(test_case) runs the test case object in
+        the device. A test passes unless it raises an exception or returns
+        False
+        info (dict, optional): device information. Defaults to
+        DeviceInformation.get_device_info()
+    """
+
+    def __init__(self, name, run_test, info=None):
+        self.name = name
+        self.run_test = run_test
+        self.info = info or DeviceInformation.get_device_info()
+
+    @property
+    def model(self):
+        return self.info["STB_MODEL_NAME"]
+
+    def can_run(self, test_case):
+        """Returns True if the test case has no model or needs this model"""
+        return test_case.get("model") in (None, self.model)
+
+
+class SimulatedDevice:
+    """run_test for a DeviceSlot that only waits, to try the scheduler
+    without decoders
+
+    Args:
+        durations (dict, optional): seconds per tc_id. Defaults to None.
+        default_secs (float, optional): seconds for other tests. Defaults to 0.01.
+        failures (list, optional): tc_id of the tests that fail. Defaults to ().
+    """
+
+    def __init__(self, durations=None, default_secs=0.01, failures=()):
+        self.durations = durations or {}
+        self.default_secs = default_secs
+        self.failures = failures
+
+    def __call__(self, test_case):
+        time.sleep(self.durations.get(test_case["tc_id"], self.default_secs))
+
+        if test_case["tc_id"] in self.failures:
+            raise AssertionError(f"{test_case['tc_id']} failed")  # noqa: E999
+
+        return True
+
+
+class Scheduler:
+    """Runs a test scope in a pool of device slots
+
+    Every device runs in its own thread with its own queue of test cases.
+    Queues are filled from the scope a few tests at a time (QUEUE_DEPTH),
+    so tests start at once and the scope is only read as it is run. Each
+    test goes to the queue of the least loaded device that can run it: test
+    cases with a "model" key only run in devices of that model. A device
+    whose queue is empty and that can not get more from the scope steals
+    the last test of the longest queue it can run. The offset of the scope
+    only moves past the tests that finished.
+
+    Example:
+        slots = [DeviceSlot("rack-1", SimulatedDevice()), ...]
+        report = Scheduler(slots).run(GetTestScope.get_test_scope(request))
+    """
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.steals = 0
+        self._scope = None
+        self._queues = {}
+        self._exhausted = False
+        self._changed = threading.Condition()
+
+    def run(self, test_scope):
+        """Runs the test scope in the device slots
+
+        Args:
+            test_scope (iterable): tests with test_case objects, like the
+            TestScope of GetTestScope.get_test_scope
+
+        Returns:
+            dict: aggregated results, see aggregate(), steals, the tests
+            taken from the queue of another device, and offset, the position
+            to resume the request from
+        """
+        start = time.time()
+        if not isinstance(test_scope, TestScope):
+            test_scope = TestScope(test_scope or [])
+        self._scope = test_scope
+        self._queues = dict((slot.name, deque()) for slot in self.slots)
+        self._exhausted = False
+        self.steals = 0
+        results = []
+
+        threads = [
+            threading.Thread(target=self._work, args=(slot, results), name=slot.name)
+            for slot in self.slots
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        report = aggregate([result for _, result in sorted(results)])
+        report["steals"] = self.steals
+        report["offset"] = test_scope.offset
+        report["wall_time"] = time.time() - start
+
+        return report
+
+    def _work(self, slot, results):
+        while True:
+            item = self._next(slot, results)
+
+            if item is None:
+                return
+
+            position, test_case = item
+            result = self._run(slot, test_case)
+
+            with self._changed:
+                results.append((position, result))
+                self._scope.complete(position)
+                self._changed.notify_all()
+
+    def _next(self, slot, results):
+        """Returns next (position, test_case) that slot can run. None when
+        the scope is finished
+
+        Waits while the queues of the other devices are full of tests that
+        slot can not run and the scope still has tests.
+        """
+        queue = self._queues[slot.name]
+
+        with self._changed:
+            while True:
+                if not queue:
+                    self._fill(slot, results)
+
+                if queue:
+                    return queue.popleft()
+
+                item = self._steal(slot)
+                if item is not None:
+                    return item
+
+                if self._exhausted:
+                    return None
+
+                self._changed.wait()
+
+    def _fill(self, slot, results):
+        """Takes tests from the scope until the queue of slot is full
+
+        Every test goes to the least loaded queue of the devices that can
+        run it. It stops after the first test that has to be queued past
+        QUEUE_DEPTH, so a device with no tests of its own does not read
+        the whole scope.
+        """
+        queue = self._queues[slot.name]
+
+        while len(queue) < QUEUE_DEPTH and not self._exhausted:
+            try:
+                position, test_case = self._scope.take()
+            except StopIteration:
+                self._exhausted = True
+                break
+
+            candidates = [other for other in self.slots if other.can_run(test_case)]
+
+            if not candidates:
+                logger.error(f"No device for {test_case}")  # noqa: E999
+                result = _result(test_case, None, False, 0, "No device for model")
+                results.append((position, result))
+                self._scope.complete(position)
+                continue
+
+            # Ties go to slot, that is waiting for tests
+            target = min(
+                candidates,
+                key=lambda other: (len(self._queues[other.name]), other is not slot),
+            )
+            target = self._queues[target.name]
+            target.append((position, test_case))
+            self._changed.notify_all()
+
+            if len(target) > QUEUE_DEPTH:
+                break
+
+    def _steal(self, slot):
+        """Returns the last test that slot can run of the longest queue"""
+        queues = sorted(self._queues.items(), key=lambda item: -len(item[1]))
+
+        for name, queue in queues:
+            if name == slot.name:
+                continue
+            for i in range(len(queue) - 1, -1, -1):
+                if slot.can_run(queue[i][1]):
+                    position, test_case = queue[i]
+                    del queue[i]
+                    self.steals += 1
+                    logger.info(
+                        f"{slot.name}: {test_case['tc_id']} from {name}"  # noqa: E999
+                    )
+                    return position, test_case
+
+        return None
+
+    @staticmethod
+    def _run(slot, test_case):
+        logger.info(f"{slot.name}: {test_case['tc_id']}")  # noqa: E999
+        start = time.time()
+
+        try:
+            passed = slot.run_test(test_case) is not False
+            error = None
+        except Exception as e:
+            passed = False
+            error = repr(e)
+
+        return _result(test_case, slot.name, passed, time.time() - start, error)
+
+
+def aggregate(results):
+    """Returns summary of a list of TestResult
+
+    Returns:
+        dict: total, passed, failed, per device counters and the results
+    """
+    devices = {}
+
+    for result in results:
+        if result.device is None:
+            continue
+        device = devices.setdefault(
+            result.device, {"tests": 0, "passed": 0, "busy_time": 0.0}
+        )
+        device["tests"] += 1
+        device["passed"] += int(result.passed)
+        device["busy_time"] += result.duration
+
+    passed = sum(1 for result in results if result.passed)
+
+    return {
+        "total": len(results),
+        "passed": passed,
+        "failed": len(results) - passed,
+        "devices": devices,
+        "results": [result._asdict() for result in results],
+    }
+
+
+def run_test_request(test_request, slots):
+    """Fetches the test scope of a test request and runs it in slots
+
+    Args:
+        test_request (dict): see GetTestScope.get_test_scope
+        slots (list): list of DeviceSlot
+
+    Returns:
+        dict: aggregated results. None if no tests were fetched
+    """
+    test_scope = GetTestScope.get_test_scope(test_request)
+
+    if test_scope is None:
+        return None
+
+    return Scheduler(slots).run(test_scope)
+
+
+def _result(test_case, device, passed, duration, error):
+    return TestResult(test_case["tc_id"], device, passed, duration, error)
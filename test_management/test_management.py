@@ -1,18 +1,26 @@
 import logging
+import os
+
+from test_management.test_plan_store import TestPlanStore
 
 logger = logging.getLogger(__file__)
 
+# Mock test plan read by GetTestScope
+TEST_PLAN = os.path.join(os.path.dirname(__file__), "test_plan_mock.csv")
+
+_store = None
+
 
 class GetTestScope:
     """Class that implements test management methods for a client.
 
     Returns:
-        list: list of tests with test_case objects
+        TestScope: lazy iterator of tests with test_case objects
         Ex:
         test_1 = {"tc_id": "TC-1", "summary": "Test 1 summary"}
         test_2 = {"tc_id": "TC-2", "summary": "Test 2 summary"}
 
-        test_scope = [test_1, test_2]
+        test_scope = TestScope([test_1, test_2])
     """
 
     @staticmethod
@@ -24,9 +32,11 @@ class GetTestScope:
             Ex:
             test_request = {"type": 1, "query": "file.xls"}
             test_request = {"type": 2, "tc_id": "TC-1", "repeat": 2}
+            An optional "offset" key skips the tests already run, to resume
+            a request after a crash from the offset of its TestScope.
 
         Returns:
-            list: list of tests with test_case objects
+            TestScope: lazy iterator of tests with test_case objects
         """
         if test_request["type"] == 1:
             return GetTestScope.scope(test_request)
@@ -43,36 +53,23 @@ class GetTestScope:
             test_request = {"type": 1, "query": "file.xls"}
 
         Returns:
-            list: list of tests with test_case objects
+            TestScope: lazy iterator of tests with test_case objects
         """
         query = test_request["query"]
-        logger.info(f"Test Entry: Query: {query}")  # noqa: E999
+        offset = int(test_request.get("offset", 0))
+        logger.info(f"Test Entry: Query: {query}, Offset: {offset}")  # noqa: E999
 
         # Mock implementation of a test fetch request
-        # Mock reads from local file
+        # Mock reads from local file, indexed once in a local database
         # Implement customer solution with Jira for instance
-        import csv
-        import os
-
-        path = os.path.dirname(__file__)
-        file_name = f"{path}/test_plan_mock.csv"  # noqa: E999
-
-        with open(file_name, "r") as csv_file:
-            reader = csv.reader(csv_file)
-
-            test_scope = []
-            for line in reader:
-                test_object = {}
-                test_object["tc_id"] = line[0]
-                test_object["summary"] = line[1]
-                test_scope.append(test_object)
+        test_scope = _get_store().query(query)
         # End of mock implementation
 
-        if len(test_scope) == 0:
+        if len(test_scope) <= offset:
             logger.error("No tests fetched")
             return None
         else:
-            return GetTestScope.validate(test_scope)
+            return TestScope(test_scope[offset:], offset=offset, total=len(test_scope))
 
     @staticmethod
     def loop(test_request):
@@ -84,51 +81,142 @@ class GetTestScope:
             test_request = {"type": 2, "tc_id": "TC-1", "repeat": 2}
 
         Returns:
-            list: list of tests with test_case objects
+            TestScope: lazy iterator of tests with test_case objects. The
+            copies of the test are only made as they are consumed.
         """
         repeat = int(test_request["repeat"])
+        offset = int(test_request.get("offset", 0))
         test_case_id = test_request["test"]
-        logger.info(f"Test Entry: TC: {test_case_id}, Repeat: {repeat}")  # noqa: E999
+        logger.info(
+            f"Test Entry: TC: {test_case_id}, Repeat: {repeat}, "  # noqa: E999
+            f"Offset: {offset}"
+        )
 
         # Mock implementation of a test fetch request
-        # Mock reads from local file
+        # Mock reads from local file, indexed once in a local database
         # Implement customer solution with Jira for instance
-        import csv
-        import os
-
-        path = os.path.dirname(__file__)
-        file_name = f"{path}/test_plan_mock.csv"  # noqa: E999
-
-        with open(file_name, "r") as csv_file:
-            reader = csv.reader(csv_file)
-
-            test_scope = []
-            test_object = {}
-            for line in reader:
-                if line[0] == test_case_id:
-                    test_object["tc_id"] = line[0]
-                    test_object["summary"] = line[1]
-                    break
+        test_object = _get_store().get(test_case_id)
         # End of mock implementation
 
-        if not test_object:
+        if not test_object or repeat <= offset:
             logger.error("No tests fetched")
             return None
         else:
-            test_scope = [test_object.copy() for _ in range(repeat)]
+            test_scope = (test_object.copy() for _ in range(offset, repeat))
 
-            return GetTestScope.validate(test_scope)
+            return TestScope(test_scope, offset=offset, total=repeat)
 
     @staticmethod
     def validate(test_scope):
-        """Validates that mandatory keys are in the objects from test list"""
-        keys = ["tc_id", "summary"]
+        """Validates that mandatory keys are in the objects from test list
+
+        A TestScope or any other iterator is not consumed: it is returned
+        as a TestScope, that validates each test case when it is taken.
+        """
+        if isinstance(test_scope, TestScope):
+            return test_scope
+        if not isinstance(test_scope, (list, tuple)):
+            return TestScope(test_scope)
+
         for test_case in test_scope:
-            if not all(key in test_case for key in keys):
-                logger.error("Tests feched does not follow the expected")
-                logger.error("Expected list of test case objects:")
-                logger.error("{{'id': 'TC-2', 'summary': 'Test 2 summary'}}")
+            if not GetTestScope.validate_test_case(test_case):
                 logger.error(f"Got: {test_scope}")  # noqa: E999
                 return None
 
         return test_scope
+
+    @staticmethod
+    def validate_test_case(test_case):
+        """Validates that mandatory keys are in a test case object"""
+        keys = ["tc_id", "summary"]
+        if not all(key in test_case for key in keys):
+            logger.error("Tests feched does not follow the expected")
+            logger.error("Expected list of test case objects:")
+            logger.error("{{'id': 'TC-2', 'summary': 'Test 2 summary'}}")
+            return False
+
+        return True
+
+
+class TestScope:
+    """Lazy iterator of test case objects
+
+    Each test case is validated when it is taken. An invalid one ends the
+    iteration, as validate() rejected the whole list. offset is the
+    position of the first test of the request not completed yet, so a run
+    stopped by a crash can be resumed passing it as the "offset" of the same
+    request. Tests are completed with complete(); iterating with for
+    completes each test when the next one is requested.
+
+    Args:
+        test_cases (iterable): test case objects from offset onwards
+        offset (int, optional): position of the first test case in the
+        request. Defaults to 0.
+        total (int, optional): number of tests of the request. Defaults to
+        None, unknown.
+    """
+
+    def __init__(self, test_cases, offset=0, total=None):
+        self.offset = offset
+        self.total = total
+        self._test_cases = iter(test_cases)
+        self._taken = offset
+        self._completed = set()
+        self._last = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._last is not None:
+            self.complete(self._last)
+            self._last = None
+
+        position, test_case = self.take()
+        self._last = position
+
+        return test_case
+
+    def __len__(self):
+        """Returns number of tests not completed. Requires total"""
+        if self.total is None:
+            raise TypeError("TestScope without total has no len()")
+        return max(0, self.total - self.offset)
+
+    def take(self):
+        """Returns (position, test_case) of the next test of the request
+
+        Raises:
+            StopIteration: when there are no more valid tests
+        """
+        test_case = next(self._test_cases)
+
+        if not GetTestScope.validate_test_case(test_case):
+            logger.error(f"Got: {test_case} at offset {self._taken}")  # noqa: E999
+            self._test_cases = iter(())
+            raise StopIteration
+
+        position = self._taken
+        self._taken += 1
+
+        return position, test_case
+
+    def complete(self, position):
+        """Marks test at position as run. offset moves past the tests
+        completed without gaps from the start
+        """
+        self._completed.add(position)
+
+        while self.offset in self._completed:
+            self._completed.remove(self.offset)
+            self.offset += 1
+
+
+def _get_store():
+    """Returns the store of TEST_PLAN, created on first use"""
+    global _store
+
+    if _store is None:
+        _store = TestPlanStore(TEST_PLAN)
+
+    return _store
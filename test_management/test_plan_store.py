@@ -0,0 +1,195 @@
+import csv
+import logging
+import os
+import sqlite3
+import threading
+
+from common.utils import storage
+
+logger = logging.getLogger(__file__)
+
+# Full text modules tried in order. None falls back to LIKE
+FTS_MODULES = ("fts5", "fts4", None)
+
+# Extensions of plan files. A query with one of them requests the whole plan
+PLAN_EXTENSIONS = (".csv", ".xls", ".xlsx")
+
+
+class TestPlanStore:
+    """Test plan parsed once and indexed in a local SQLite file
+
+    Test cases are indexed by tc_id and their summaries by a full text
+    index. The source file is only read again when its mtime or size
+    change, and then only the rows that changed are written.
+
+    Args:
+        source (str): CSV file with tc_id,summary lines
+        path (str, optional): SQLite file. Defaults to a file in the data
+        directory named after the source.
+    """
+
+    def __init__(self, source, path=None):
+        self.source = os.path.abspath(source)
+        self.path = path
+        self.fts = None
+        self._db = None
+        self._lock = threading.Lock()
+
+    @property
+    def db(self):
+        if self._db is None:
+            name = os.path.splitext(os.path.basename(self.source))[0]
+            path = self.path or storage.data_path(f"test_plan_{name}.sqlite")
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS plan "
+                "(position INTEGER PRIMARY KEY, tc_id TEXT, summary TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS plan_tc_id ON plan (tc_id)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self.fts = self._create_fts()
+            self._db.commit()
+
+        return self._db
+
+    def refresh(self):
+        """Reads the source again if it changed since the last refresh
+
+        Returns:
+            bool: True if the source was read
+        """
+        stat = os.stat(self.source)
+        signature = f"{self.source}:{stat.st_mtime_ns}:{stat.st_size}"
+
+        with self._lock:
+            row = self.db.execute(
+                "SELECT value FROM meta WHERE key = 'signature'"
+            ).fetchone()
+
+            if row is not None and row[0] == signature:
+                return False
+
+            changed = self._update(_read_plan(self.source))
+            self.db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)",
+                (signature,),
+            )
+            self.db.commit()
+
+        logger.info(f"Test plan {self.source}: {changed} rows updated")  # noqa: E999
+        return True
+
+    def all(self):
+        """Returns all test case objects in plan order"""
+        self.refresh()
+        return self._objects(
+            self.db.execute("SELECT tc_id, summary FROM plan ORDER BY position")
+        )
+
+    def get(self, tc_id):
+        """Returns first test case object with tc_id. None if not found"""
+        self.refresh()
+        row = self.db.execute(
+            "SELECT tc_id, summary FROM plan WHERE tc_id = ? ORDER BY position LIMIT 1",
+            (tc_id,),
+        ).fetchone()
+
+        return self._objects([row])[0] if row else None
+
+    def search(self, text):
+        """Returns test case objects whose summary has all the words of text"""
+        self.refresh()
+        words = text.split()
+
+        if not words:
+            return self.all()
+
+        if self.fts is not None:
+            match = " ".join('"{}"'.format(word.replace('"', '""')) for word in words)
+            rows = self.db.execute(
+                "SELECT plan.tc_id, plan.summary FROM plan_fts "
+                "JOIN plan ON plan.position = plan_fts.rowid "
+                "WHERE plan_fts MATCH ? ORDER BY plan.position",
+                (match,),
+            )
+        else:
+            rows = self.db.execute(
+                "SELECT tc_id, summary FROM plan WHERE "
+                + " AND ".join("summary LIKE ?" for _ in words)
+                + " ORDER BY position",
+                ["%{}%".format(word) for word in words],
+            )
+
+        return self._objects(rows)
+
+    def query(self, query):
+        """Answers the query of a type 1 test request
+
+        A plan file name (or no query) returns the whole plan, any other
+        text returns the tests whose summary has its words.
+        """
+        if not query or query.lower().endswith(PLAN_EXTENSIONS):
+            return self.all()
+
+        return self.search(query)
+
+    def _update(self, lines):
+        """Writes the rows that differ from the stored plan"""
+        stored = dict(
+            (position, (tc_id, summary))
+            for position, tc_id, summary in self.db.execute(
+                "SELECT position, tc_id, summary FROM plan"
+            )
+        )
+        changed = 0
+
+        for position, line in enumerate(lines):
+            if stored.pop(position, None) == line:
+                continue
+
+            self.db.execute(
+                "INSERT OR REPLACE INTO plan (position, tc_id, summary) "
+                "VALUES (?, ?, ?)",
+                (position,) + line,
+            )
+            if self.fts is not None:
+                self.db.execute("DELETE FROM plan_fts WHERE rowid = ?", (position,))
+                self.db.execute(
+                    "INSERT INTO plan_fts (rowid, summary) VALUES (?, ?)",
+                    (position, line[1]),
+                )
+            changed += 1
+
+        for position in stored:
+            self.db.execute("DELETE FROM plan WHERE position = ?", (position,))
+            if self.fts is not None:
+                self.db.execute("DELETE FROM plan_fts WHERE rowid = ?", (position,))
+            changed += 1
+
+        return changed
+
+    def _create_fts(self):
+        for module in FTS_MODULES:
+            if module is None:
+                logger.warning("SQLite without full text search, using LIKE")
+                return None
+            try:
+                self._db.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS plan_fts "
+                    f"USING {module}(summary)"  # noqa: E999
+                )
+                return module
+            except sqlite3.OperationalError:
+                continue
+
+    @staticmethod
+    def _objects(rows):
+        return [{"tc_id": tc_id, "summary": summary} for tc_id, summary in rows]
+
+
+def _read_plan(source):
+    """Returns (tc_id, summary) of the lines of the CSV plan"""
+    with open(source, "r") as csv_file:
+        return [(line[0], line[1]) for line in csv.reader(csv_file) if len(line) >= 2]
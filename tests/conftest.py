@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import pytest
+
+# Tests import the packages of the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.utils import storage  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Keeps the local stores of every test in its own directory"""
+    monkeypatch.setenv(storage.DATA_DIR_ENV, str(tmp_path))
+    return tmp_path
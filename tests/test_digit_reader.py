@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import os
+import threading
+
+import pytest
+
+stbt = pytest.importorskip("stbt")
+
+from common.utils import digit_reader  # noqa: E402
+from common.utils.digit_reader import DIGITS, DigitReader  # noqa: E402
+
+GUIDE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "common",
+    "pages",
+    "guia",
+    "images",
+    "ref",
+    "_guia.png",
+)
+
+# Times of the timeline of the guide, all in the same font. Their colon is
+# too small to be a glyph, so it is read as a space
+TIMELINE = {
+    "21 30": stbt.Region(525, 115, width=55, height=22),
+    "22 30": stbt.Region(870, 115, width=55, height=22),
+    "23 00": stbt.Region(1042, 115, width=55, height=22),
+}
+
+# Start and end times of the focused event, in a smaller font
+EVENT_START = stbt.Region(350, 607, width=55, height=24)
+EVENT_END = stbt.Region(1008, 607, width=55, height=24)
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return stbt.load_image(GUIDE)
+
+
+def ocr(text):
+    calls = []
+
+    def fallback():
+        calls.append(text)
+        return text
+
+    return fallback, calls
+
+
+def test_glyphs_are_learned_after_confirmations(frame):
+    reader = DigitReader("test_timeline")
+
+    for text, region in sorted(TIMELINE.items()):
+        fallback, calls = ocr(text)
+        assert reader.read(frame, region, fallback).text == text
+        assert calls == [text]
+
+    # 2, 3 and 0 were read by OCR in 3 different images
+    fallback, calls = ocr("22 30")
+    reading = reader.read(frame, TIMELINE["22 30"], fallback)
+
+    assert calls == []
+    assert reading.text == "22 30"
+    assert reading.confidence >= reader.threshold
+
+
+def test_similar_glyphs_stay_below_the_threshold(frame, monkeypatch):
+    monkeypatch.setattr(digit_reader, "CONFIRMATIONS", 1)
+    reader = DigitReader("test_event_times", charset=DIGITS + ":")
+    reader.read(frame, EVENT_END, ocr("21:30")[0])
+
+    # 8 is not in the set and its closest glyph is the 3 of 21:30
+    fallback, calls = ocr("21:08")
+    reading = reader.read(frame, EVENT_START, fallback)
+
+    assert calls == ["21:08"]
+    assert reading.confidence < reader.threshold
+    assert reading.text == "21:08"
+
+    # Once learned, the 8 is told apart from the 3
+    assert reader.recognize(digit_reader.crop(frame, EVENT_START)).text == "21:08"
+    assert reader.recognize(digit_reader.crop(frame, EVENT_END)).text == "21:30"
+
+
+def test_recognize_while_the_set_changes(frame, monkeypatch):
+    monkeypatch.setattr(digit_reader, "CONFIRMATIONS", 1)
+    reader = DigitReader("test_threads", charset=DIGITS + ":")
+    image = digit_reader.crop(frame, EVENT_END)
+    errors = []
+    done = threading.Event()
+
+    def recognize():
+        try:
+            while not done.is_set():
+                reader.recognize(image)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=recognize)
+    thread.start()
+    try:
+        for _ in range(50):
+            reader.learn(image, "21:30")
+            reader.reset()
+    finally:
+        done.set()
+        thread.join()
+
+    assert errors == []
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from common.utils import key_timing
+
+
+@pytest.fixture(autouse=True)
+def profiles(monkeypatch):
+    monkeypatch.setattr(key_timing, "_profiles", {})
+
+
+def test_calibrate_finds_the_shortest_key_gap():
+    gaps = []
+
+    def trial(gap):
+        gaps.append(gap)
+        # The STB takes the entry with gaps of 0.3s or more
+        return 2.0 + gap if gap >= 0.3 else None
+
+    profile = key_timing.calibrate(trial, model="PTT-1000")
+
+    low, high = key_timing.GAP_RANGE
+    resolution = (high - low) / 2 ** key_timing.GAP_ITERATIONS
+
+    assert len(gaps) == key_timing.GAP_ITERATIONS + 1
+    assert 0.3 <= profile.key_gap_secs / key_timing.SAFETY_MARGIN <= 0.3 + resolution
+    # Slowest commit of the successful trials
+    assert profile.commit_secs == round(3.0 * key_timing.SAFETY_MARGIN, 3)
+
+
+def test_calibrate_stores_the_profile_of_the_model():
+    profile = key_timing.calibrate(lambda gap: 1.0, model="PTT-1000")
+
+    key_timing._profiles.clear()
+
+    assert key_timing.get_profile("PTT-1000") == profile
+    assert key_timing.get_profile("PTT-2000") == key_timing.DEFAULT_PROFILE
+
+
+def test_calibrate_fails_when_the_widest_gap_fails():
+    with pytest.raises(RuntimeError):
+        key_timing.calibrate(lambda gap: None, model="PTT-1000")
+
+    assert key_timing.get_profile("PTT-1000") == key_timing.DEFAULT_PROFILE
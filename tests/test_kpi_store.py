@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from common.utils.kpi_store import KpiStore
+
+DEVICE_INFO = {"STB_MODEL_NAME": "PTT-1000", "VERSION": "v1.2"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return KpiStore(path=str(tmp_path / "kpi.sqlite"), batch_size=3)
+
+
+def record(store, values, device_info=DEVICE_INFO):
+    with store.start_run("TC-6", device_info) as run:
+        for value in values:
+            run.record("app_access_time", value)
+
+
+def test_percentile_is_nearest_rank(store):
+    record(store, [7, 3, 10, 1, 5, 2, 9, 4, 6, 8])
+
+    assert store.percentile("TC-6", "app_access_time", 0) == 1
+    assert store.percentile("TC-6", "app_access_time", 50) == 5
+    assert store.percentile("TC-6", "app_access_time", 90) == 9
+    assert store.percentile("TC-6", "app_access_time", 95) == 10
+    assert store.percentile("TC-6", "app_access_time", 100) == 10
+
+
+def test_percentile_without_measurements_is_none(store):
+    assert store.percentile("TC-6", "app_access_time", 50) is None
+
+
+def test_percentile_spans_runs_and_filters_by_model(store):
+    record(store, [1, 2])
+    record(store, [30, 40], dict(DEVICE_INFO, STB_MODEL_NAME="PTT-2000"))
+
+    assert store.percentile("TC-6", "app_access_time", 100) == 40
+    assert store.percentile("TC-6", "app_access_time", 100, model="PTT-1000") == 2
+
+
+def test_summary(store):
+    record(store, [1, 2, 3, 4])
+    record(store, [5])
+
+    summary = store.summary("TC-6", "app_access_time")
+
+    assert summary["runs"] == 2
+    assert summary["count"] == 5
+    assert (summary["min"], summary["max"], summary["avg"]) == (1, 5, 3)
+    assert (summary["p50"], summary["p90"], summary["p95"]) == (3, 5, 5)
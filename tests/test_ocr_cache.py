@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+stbt = pytest.importorskip("stbt")
+
+from common.utils import ocr_cache  # noqa: E402
+
+REGION = stbt.Region(10, 10, width=20, height=10)
+
+
+def frame(value, time=0.0):
+    pixels = np.zeros((72, 128, 3), dtype=np.uint8)
+    pixels[REGION.y : REGION.bottom, REGION.x : REGION.right] = value
+    return stbt.Frame(pixels, time=time)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ocr_cache.OcrCache(path=str(tmp_path / "ocr_cache.sqlite"))
+
+
+def counter(value):
+    calls = []
+
+    def compute():
+        calls.append(value)
+        return value
+
+    return compute, calls
+
+
+def test_same_pixels_are_read_once(cache):
+    compute, calls = counter("123")
+
+    # Different captures, same pixels in the region
+    assert cache.cached(frame(200, time=1.0), REGION, "ocr", compute) == "123"
+    assert cache.cached(frame(200, time=2.0), REGION, "ocr", compute) == "123"
+
+    assert calls == ["123"]
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_pixels_and_parameters_are_part_of_the_key(cache):
+    compute, calls = counter("123")
+
+    cache.cached(frame(200), REGION, "ocr", compute)
+    cache.cached(frame(100), REGION, "ocr", compute)
+    cache.cached(frame(200), REGION, "ocr spa", compute)
+    # Pixels outside the region do not change the key
+    outside = frame(200)
+    outside[0, 0] = 255
+    cache.cached(outside, REGION, "ocr", compute)
+
+    assert len(calls) == 3
+
+
+def test_results_persist_across_instances(tmp_path, cache):
+    cache.cached(frame(200), REGION, "ocr", counter("123")[0])
+
+    reopened = ocr_cache.OcrCache(path=cache.path)
+    compute, calls = counter("456")
+
+    assert reopened.cached(frame(200), REGION, "ocr", compute) == "123"
+    assert calls == []
+
+
+def test_least_recently_used_results_are_evicted(monkeypatch, tmp_path):
+    monkeypatch.setattr(ocr_cache, "EVICTION_INTERVAL", 1)
+    cache = ocr_cache.OcrCache(path=str(tmp_path / "lru.sqlite"), max_entries=2)
+
+    keys = [cache.key(frame(value), REGION, "ocr") for value in (1, 2, 3)]
+    cache.put(keys[0], "a")
+    cache.put(keys[1], "b")
+    # A hit makes the first result the most recently used
+    assert cache.get(keys[0]) == "a"
+    cache.put(keys[2], "c")
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "a"
+    assert cache.get(keys[2]) == "c"
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+stbt = pytest.importorskip("stbt")
+
+from common.utils.page_object import _freeze  # noqa: E402
+
+
+def test_hashable_values_are_unchanged():
+    region = stbt.Region(0, 0, width=10, height=10)
+
+    assert _freeze("./images/logo.png") == "./images/logo.png"
+    assert _freeze(region) == region
+    assert _freeze(None) is None
+
+
+def test_dicts_do_not_depend_on_key_order():
+    first = _freeze({"mode": 1, "lang": "spa"})
+
+    assert first == _freeze({"lang": "spa", "mode": 1})
+    assert first != _freeze({"lang": "eng", "mode": 1})
+    hash(first)
+
+
+def test_match_parameters_are_compared_by_value():
+    first = _freeze(stbt.MatchParameters(confirm_threshold=0.3))
+
+    assert first == _freeze(stbt.MatchParameters(confirm_threshold=0.3))
+    assert first != _freeze(stbt.MatchParameters(confirm_threshold=0.4))
+    hash(first)
+
+
+def test_images_are_compared_by_identity():
+    image = np.zeros((2, 2), dtype=np.uint8)
+
+    assert _freeze(image) == _freeze(image)
+    assert _freeze(image) != _freeze(image.copy())
+
+
+def test_unhashable_values_use_their_repr():
+    assert _freeze({"colors": [1, 2]}) == (("colors", "[1, 2]"),)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from test_management.scheduler import QUEUE_DEPTH, DeviceSlot, Scheduler
+
+
+def _test_cases(count, model=None):
+    test_cases = [{"tc_id": "TC-{}".format(i), "summary": "Test"} for i in range(count)]
+    for test_case in test_cases:
+        if model:
+            test_case["model"] = model
+    return test_cases
+
+
+class Recorder:
+    """run_test that records the tests run and waits secs"""
+
+    def __init__(self, secs=0.001):
+        self.secs = secs
+        self.run = []
+
+    def __call__(self, test_case):
+        self.run.append(test_case)
+        time.sleep(self.secs)
+
+
+def slot(name, model, run_test):
+    return DeviceSlot(name, run_test, {"STB_MODEL_NAME": model})
+
+
+def test_every_test_runs_once_in_a_device_of_its_model():
+    devices = {"a": Recorder(), "b": Recorder(), "c": Recorder()}
+    slots = [
+        slot("a", "X", devices["a"]),
+        slot("b", "Y", devices["b"]),
+        slot("c", "X", devices["c"]),
+    ]
+    test_cases = _test_cases(30) + _test_cases(10, "Y") + _test_cases(10, "X")
+
+    report = Scheduler(slots).run(test_cases)
+
+    assert report["total"] == report["passed"] == 50
+    assert report["offset"] == 50
+    assert sum(len(device.run) for device in devices.values()) == 50
+    assert all(test_case.get("model") in (None, "X") for test_case in devices["a"].run)
+    assert all(test_case.get("model") in (None, "X") for test_case in devices["c"].run)
+    assert all(test_case.get("model") in (None, "Y") for test_case in devices["b"].run)
+
+
+def test_results_keep_the_order_of_the_scope():
+    slots = [slot("a", "X", Recorder()), slot("b", "X", Recorder(0.005))]
+
+    report = Scheduler(slots).run(_test_cases(20))
+
+    assert [result["tc_id"] for result in report["results"]] == [
+        test_case["tc_id"] for test_case in _test_cases(20)
+    ]
+
+
+def test_failures_and_tests_without_device_are_reported():
+    def run_test(test_case):
+        if test_case["tc_id"] == "TC-1":
+            raise AssertionError("failed")
+
+    slots = [slot("a", "X", run_test)]
+
+    report = Scheduler(slots).run(_test_cases(3) + _test_cases(1, "Z"))
+
+    assert report["total"] == 4
+    assert report["failed"] == 2
+    errors = dict((result["tc_id"], result["error"]) for result in report["results"])
+    assert "failed" in errors["TC-1"]
+    assert report["results"][-1]["device"] is None
+    assert report["offset"] == 4
+
+
+def test_idle_devices_steal_queued_tests():
+    slow = Recorder(0.2)
+    slots = [
+        slot("slow", "X", slow),
+        slot("a", "X", Recorder()),
+        slot("b", "X", Recorder()),
+    ]
+
+    report = Scheduler(slots).run(_test_cases(20))
+
+    assert report["total"] == 20
+    assert report["steals"] >= 1
+    assert len(slow.run) < 5
+
+
+def test_scope_is_read_as_it_is_run():
+    pulled = []
+    started = []
+    ahead = []
+    lock = threading.Lock()
+
+    def scope():
+        for test_case in _test_cases(100, "Y"):
+            pulled.append(test_case)
+            yield test_case
+
+    def run_test(test_case):
+        with lock:
+            started.append(test_case)
+            ahead.append(len(pulled) - len(started))
+
+    # Device "a" can not run any test: it must not read the whole scope
+    slots = [slot("a", "X", Recorder()), slot("b", "Y", run_test)]
+
+    report = Scheduler(slots).run(scope())
+
+    assert report["total"] == 100
+    assert max(ahead) <= QUEUE_DEPTH + 1
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("stbt")
+
+from common.utils import templates  # noqa: E402
+
+
+@pytest.fixture
+def images(tmp_path):
+    """Page module with three 10x10 reference images of 300 bytes each"""
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+
+    for i, name in enumerate(("a", "b", "c")):
+        image = np.full((10, 10, 3), i * 50, dtype=np.uint8)
+        cv2.imwrite(str(images_dir / (name + ".png")), image)
+
+    return str(tmp_path / "page_test.py")
+
+
+def test_images_are_decoded_once(tmp_path, images):
+    registry = templates.TemplateRegistry(root=str(tmp_path))
+
+    first = registry.get("./images/a.png", images)
+
+    assert registry.get("./images/a.png", images) is first
+    stats = registry.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["known"] == 3
+
+
+def test_least_recently_used_images_are_evicted(tmp_path, images):
+    registry = templates.TemplateRegistry(root=str(tmp_path), max_bytes=600)
+
+    registry.get("./images/a.png", images)
+    registry.get("./images/b.png", images)
+    # a is used again, so b is the least recently used
+    registry.get("./images/a.png", images)
+    registry.get("./images/c.png", images)
+
+    stats = registry.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes_resident"] <= 600
+
+    misses = stats["misses"]
+    registry.get("./images/a.png", images)
+    assert registry.stats()["misses"] == misses
+    registry.get("./images/b.png", images)
+    assert registry.stats()["misses"] == misses + 1
+
+
+def test_last_image_is_kept_even_if_bigger_than_the_limit(tmp_path, images):
+    registry = templates.TemplateRegistry(root=str(tmp_path), max_bytes=100)
+
+    registry.get("./images/a.png", images)
+    registry.get("./images/b.png", images)
+
+    assert registry.stats()["entries"] == 1
+
+
+def test_gray_copies_share_the_cache(tmp_path, images):
+    registry = templates.TemplateRegistry(root=str(tmp_path))
+
+    gray, mask = registry.get_gray("./images/b.png", images)
+
+    assert gray.shape == (10, 10)
+    assert mask is None
+    assert registry.get_gray("./images/b.png", images)[0] is gray
+    assert registry.stats()["entries"] == 2
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from test_management import test_management
+from test_management.test_management import GetTestScope
+
+
+def _test_cases(count):
+    return [{"tc_id": "TC-{}".format(i), "summary": "Test"} for i in range(count)]
+
+
+def test_offset_moves_past_completed_tests_without_gaps():
+    scope = test_management.TestScope(_test_cases(3))
+    positions = [scope.take()[0] for _ in range(3)]
+
+    assert positions == [0, 1, 2]
+
+    scope.complete(1)
+    assert scope.offset == 0
+
+    scope.complete(0)
+    assert scope.offset == 2
+
+    scope.complete(2)
+    assert scope.offset == 3
+
+
+def test_positions_start_at_the_offset_of_the_request():
+    scope = test_management.TestScope(_test_cases(3), offset=5, total=8)
+
+    assert len(scope) == 3
+    assert scope.take()[0] == 5
+
+    scope.complete(5)
+    assert scope.offset == 6
+    assert len(scope) == 2
+
+
+def test_iteration_completes_a_test_when_the_next_one_is_requested():
+    scope = test_management.TestScope(_test_cases(2))
+
+    next(scope)
+    assert scope.offset == 0
+
+    next(scope)
+    assert scope.offset == 1
+
+    assert list(scope) == []
+    assert scope.offset == 2
+
+
+def test_invalid_test_case_ends_the_scope():
+    test_cases = _test_cases(1) + [{"tc_id": "TC-X"}] + _test_cases(1)
+    scope = test_management.TestScope(test_cases)
+
+    assert len(list(scope)) == 1
+
+
+def test_loop_resumes_from_offset():
+    request = {"type": 2, "test": "TC-1", "repeat": 3, "offset": 1}
+
+    scope = GetTestScope.get_test_scope(request)
+
+    assert scope.offset == 1
+    assert [test_case["tc_id"] for test_case in scope] == ["TC-1", "TC-1"]
+    assert scope.offset == 3
+
+
+def test_validate_does_not_consume_a_lazy_scope():
+    scope = test_management.TestScope(iter(_test_cases(2)))
+
+    assert GetTestScope.validate(scope) is scope
+    assert len(list(scope)) == 2